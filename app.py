@@ -1,15 +1,33 @@
 import os
+import asyncio
 import logging
-from flask import Flask, request, jsonify
+import tempfile
+import functools
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from cachetools import LRUCache, TTLCache
+from quart import Quart, request, jsonify
+from quart.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 from goformz_client import GoFormzClient
-from shiftcare_automation import ShiftcareAutomation
+from shiftcare_automation import ShiftcareAutomation, close_shared_browser
 from pdf_parser import PDFParser
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster request/response encoding"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,90 +36,194 @@ logger = logging.getLogger(__name__)
 # Initialize clients
 goformz_client = GoFormzClient(
     client_id=os.getenv('GOFORMZ_CLIENT_ID'),
-    client_secret=os.getenv('GOFORMZ_CLIENT_SECRET')
+    client_secret=os.getenv('GOFORMZ_CLIENT_SECRET'),
+    token_cache_path=os.getenv('GOFORMZ_TOKEN_CACHE')
 )
 
 shiftcare_automation = ShiftcareAutomation(
     username=os.getenv('SHIFTCARE_USERNAME'),
-    password=os.getenv('SHIFTCARE_PASSWORD')
+    password=os.getenv('SHIFTCARE_PASSWORD'),
+    http_create=os.getenv('SHIFTCARE_HTTP_CREATE', '').lower() == 'true',
+    storage_state_path=os.getenv('SHIFTCARE_STORAGE_STATE')
 )
 
-pdf_parser = PDFParser()
+pdf_parser = PDFParser(cache_dir=os.getenv('PDF_PARSE_CACHE'))
+
+# Upper bound on forms processed concurrently per batch, to avoid overwhelming GoFormz
+MAX_CONCURRENT_FORMS = 16
+
+# Blocking work (PDF parsing, sync API calls) runs on a bounded thread pool
+executor = ThreadPoolExecutor(max_workers=int(os.getenv('WORKER_THREADS', 8)))
+
+# PDFs up to this size stay in memory while parsing; larger ones spill to disk
+PDF_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Bodies smaller than this cannot be a real form PDF and are rejected after HEAD
+MIN_PDF_SIZE = 1024
+
+# ETag of each form's PDF when it was last created successfully in Shiftcare; bounded so a
+# long-running worker does not keep one entry for every form it has ever seen
+processed_etags = LRUCache(maxsize=4096)
+
+# Batch jobs run in the background; queued and running ones are never evicted
+active_jobs = {}
+# Finished and failed jobs are kept for an hour so clients can poll their results
+finished_jobs = TTLCache(maxsize=256, ttl=3600)
+
+async def run_blocking(func, *args):
+    """Run a blocking callable on the worker pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+@app.before_serving
+async def warm_shiftcare():
+    # Log in once at boot so each form reuses the same browser session, and warm the session pool
+    try:
+        if not await shiftcare_automation.ensure_logged_in():
+            logger.warning("Shiftcare login failed at startup; will retry per form")
+        else:
+            await shiftcare_automation.warm_pool()
+    except Exception as e:
+        logger.warning("Could not start Shiftcare browser at startup: %s", e)
+
+@app.after_serving
+async def close_clients():
+    await goformz_client.aclose()
+    await shiftcare_automation.close_browser()
+    await close_shared_browser()
+    executor.shutdown(wait=False)
 
 @app.route('/', methods=['GET'])
-def home():
+async def home():
     return jsonify({
         "message": "GoFormz-Shiftcare Integration API",
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
             "forms": "/forms",
-            "process_packets": "/process-packets"
+            "process_packets": "/process-packets",
+            "jobs": "/jobs/<job_id>"
         }
     })
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     return jsonify({"status": "healthy"})
 
-@app.route('/process-packets', methods=['POST'])
-def process_packets():
+async def _process_form(form_id):
+    """Download, parse and create a single form in Shiftcare"""
     try:
-        # Get form IDs from request or fetch all recent forms
-        form_ids = request.json.get('form_ids', [])
+        # Check the PDF headers before paying for the body
+        content_length, content_type, etag = await goformz_client.head_form_pdf_async(form_id)
+        if content_type and not content_type.startswith('application/pdf'):
+            return {"form_id": form_id, "error": f"Unexpected content type {content_type}"}
+        if content_length is not None and content_length < MIN_PDF_SIZE:
+            return {"form_id": form_id, "error": f"PDF too small ({content_length} bytes)"}
+        if etag and processed_etags.get(form_id) == etag:
+            return {"form_id": form_id, "skipped": "Unchanged since last successful run"}
         
-        if not form_ids:
-            # Fetch recent forms from GoFormz
-            forms = goformz_client.get_recent_forms()
-            form_ids = [form['id'] for form in forms]
+        with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE) as pdf_file:
+            # Stream PDF from GoFormz
+            await goformz_client.download_form_pdf_stream_async(form_id, pdf_file)
+            pdf_file.seek(0)
+            
+            # Parse PDF to extract data
+            parsed_data = await run_blocking(pdf_parser.parse_pdf, pdf_file)
         
-        results = []
+        # Determine if it's a client or employee packet
+        packet_type = pdf_parser.determine_packet_type(parsed_data)
         
-        for form_id in form_ids:
-            try:
-                # Download PDF from GoFormz
-                pdf_data = goformz_client.download_form_pdf(form_id)
-                
-                # Parse PDF to extract data
-                parsed_data = pdf_parser.parse_pdf(pdf_data)
-                
-                # Determine if it's a client or employee packet
-                packet_type = pdf_parser.determine_packet_type(parsed_data)
-                
-                # Create in Shiftcare
+        # Create in Shiftcare on a pooled, logged-in context of the shared browser, so the forms
+        # of a batch are created side by side; the create methods report a failed login themselves
+        if packet_type not in ('client', 'employee'):
+            result = {"error": "Unknown packet type"}
+        else:
+            async with shiftcare_automation.session() as session:
                 if packet_type == 'client':
-                    result = shiftcare_automation.create_client_with_care_plan_sync(parsed_data)
-                elif packet_type == 'employee':
-                    result = shiftcare_automation.create_employee_sync(parsed_data)
+                    result = await session.create_client_with_care_plan(parsed_data)
+                elif session.http_create:
+                    result = await session.create_employee_http(parsed_data)
                 else:
-                    result = {"error": "Unknown packet type"}
-                
-                results.append({
-                    "form_id": form_id,
-                    "packet_type": packet_type,
-                    "result": result
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing form {form_id}: {str(e)}")
-                results.append({
-                    "form_id": form_id,
-                    "error": str(e)
-                })
+                    result = await session.create_employee(parsed_data)
+        
+        if etag and result.get('success'):
+            processed_etags[form_id] = etag
+        
+        return {
+            "form_id": form_id,
+            "packet_type": packet_type,
+            "result": result
+        }
         
-        return jsonify({"results": results})
+    except Exception as e:
+        logger.error("Error processing form %s: %s", form_id, e)
+        return {
+            "form_id": form_id,
+            "error": str(e)
+        }
+
+def _finish_job(job_id, job):
+    """Move a job that is done out of the active jobs and into the expiring cache"""
+    finished_jobs[job_id] = job
+    active_jobs.pop(job_id, None)
+
+async def _process_batch(job_id, form_ids):
+    """Process a batch of forms and record the results on the job"""
+    active_jobs[job_id] = {"status": "running"}
+    try:
+        if form_ids:
+            source = form_ids
+        else:
+            # Fetch recent forms from GoFormz and take their ids lazily
+            forms = await run_blocking(goformz_client.get_recent_forms)
+            source = (form['id'] for form in forms)
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FORMS)
+        
+        async def _process(form_id):
+            async with semaphore:
+                return await _process_form(form_id)
+        
+        # Forms are independent, so downloads and parsing overlap across the batch.
+        # _process_form reports its own failures, so results keep form order.
+        results = await asyncio.gather(*(_process(fid) for fid in source))
+        _finish_job(job_id, {"status": "finished", "results": list(results)})
         
     except Exception as e:
-        logger.error(f"Error in process_packets: {str(e)}")
+        logger.error("Error in batch %s: %s", job_id, e)
+        _finish_job(job_id, {"status": "failed", "error": str(e)})
+
+@app.route('/process-packets', methods=['POST'])
+async def process_packets():
+    try:
+        # Get form IDs from request, or process all recent forms
+        payload = await request.get_json(silent=True) or {}
+        form_ids = payload.get('form_ids', [])
+        
+        job_id = uuid.uuid4().hex
+        active_jobs[job_id] = {"status": "queued"}
+        app.add_background_task(_process_batch, job_id, form_ids)
+        
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+        
+    except Exception as e:
+        logger.error("Error in process_packets: %s", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+async def get_job(job_id):
+    job = active_jobs.get(job_id) or finished_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify({"job_id": job_id, **job})
+
 @app.route('/forms', methods=['GET'])
-def get_forms():
+async def get_forms():
     try:
-        forms = goformz_client.get_recent_forms()
+        forms = await run_blocking(goformz_client.get_recent_forms)
         return jsonify({"forms": forms})
     except Exception as e:
-        logger.error(f"Error fetching forms: {str(e)}")
+        logger.error("Error fetching forms: %s", e)
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
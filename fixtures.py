@@ -0,0 +1,224 @@
+"""
+Shared sample packet fixtures for the integration test scripts
+"""
+
+import os
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+from dotenv import load_dotenv
+
+# Load environment variables once for every test script, before the settings below are read
+load_dotenv()
+
+# Shiftcare login cookies saved by one test run and reused by the next while the server still accepts them
+SHIFTCARE_STORAGE_STATE_PATH = os.getenv('SHIFTCARE_STORAGE_STATE', '.shiftcare_state.json')
+# Credentials the Shiftcare browser tests need; the parser tests run without any
+SHIFTCARE_ENV_VARS = ('SHIFTCARE_USERNAME', 'SHIFTCARE_PASSWORD')
+# Credentials the full integration tests need
+INTEGRATION_ENV_VARS = ('GOFORMZ_CLIENT_ID', 'GOFORMZ_CLIENT_SECRET', *SHIFTCARE_ENV_VARS)
+# Read once at import; the test scripts look credentials up here instead of in os.environ
+ENV: Mapping[str, Any] = MappingProxyType({var: os.getenv(var) for var in INTEGRATION_ENV_VARS})
+
+def _freeze(value):
+    """Recursively wrap dicts in read-only proxies and lists in tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def require_env_vars(names: Sequence[str] = INTEGRATION_ENV_VARS) -> bool:
+    """Report any missing credentials; True means all of them are set"""
+    missing_vars = [var for var in names if not ENV[var]]
+    if not missing_vars:
+        print("✓ All environment variables found")
+        return True
+    print("✗ Missing environment variables:")
+    for var in missing_vars:
+        print(f"  - {var}")
+    print("\nPlease create a .env file with the required variables.")
+    return False
+
+def skip_shiftcare_tests() -> bool:
+    """Report any missing Shiftcare credentials; True means the browser tests should be skipped"""
+    missing_vars = [var for var in SHIFTCARE_ENV_VARS if not ENV[var]]
+    if not missing_vars:
+        print("✓ All environment variables found")
+        return False
+    print("[skip] Shiftcare browser tests, missing environment variables:")
+    for var in missing_vars:
+        print(f"  - {var}")
+    print("\nCreate a .env file with them to run the browser tests too.")
+    return True
+
+def editable_copy(value):
+    """Plain dict/list copy of a frozen fixture, for a test that needs to change it"""
+    if isinstance(value, MappingProxyType):
+        return {k: editable_copy(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [editable_copy(v) for v in value]
+    return value
+
+# Client packet text as it comes out of the PDF
+SAMPLE_CLIENT_TEXT = """
+    Client Packet
+    
+    Name: Mr. John Smith
+    Preferred Name: Johnny
+    Date of Birth: 05/15/1975
+    Gender: Male
+    SSN: 123-45-6789
+    Place of Birth: Denver, Colorado
+    Languages: English, Spanish
+    
+    Primary Phone: (555) 123-4567
+    Secondary Phone: (555) 123-4568
+    Primary Email: john.smith@email.com
+    Secondary Email: johnny.smith@gmail.com
+    
+    Address: 123 Main Street
+    Unit: Apt 4B
+    Postal Code: 80202
+    
+    Preferred Contact Method: Phone
+    
+    Religion: Christian
+    Marital Status: Married
+    Nationality: American
+    Ethnicity: Caucasian
+    
+    Emergency Contact: Jane Smith
+    Emergency Phone: (555) 987-6543
+    
+    Medical Conditions: Diabetes, Hypertension
+    Medications: Metformin, Lisinopril
+    """
+
+# Same client packet with the care plan section filled in
+SAMPLE_CARE_PLAN_CLIENT_TEXT = SAMPLE_CLIENT_TEXT + """
+    Care Plan: Initial Assessment
+    Start Date: 10/25/2025
+    End Date: 11/25/2025
+    
+    Goals:
+    1. Maintain blood sugar levels within normal range
+    2. Improve blood pressure control
+    3. Increase physical activity
+    4. Maintain medication compliance
+    
+    Tasks:
+    1. Monitor blood glucose daily
+    2. Take medications as prescribed
+    3. Follow diabetic diet plan
+    4. Exercise 30 minutes daily
+    5. Attend monthly check-ups
+    6. Check blood pressure weekly
+    """
+
+SAMPLE_EMPLOYEE_TEXT = """
+    Employee Packet
+    
+    Name: Dr. Sarah Johnson
+    Date of Birth: 03/22/1985
+    Gender: Female
+    Phone: (555) 234-5678
+    Email: sarah.johnson@email.com
+    Address: 456 Oak Street, Denver, CO 80202
+    
+    Position: Registered Nurse
+    Department: Home Care
+    Employment Type: Full-time
+    
+    Emergency Contact: Michael Johnson
+    Emergency Phone: (555) 234-5679
+    
+    Medical Conditions: None
+    Medications: None
+    """
+
+# Parsed data in the shape PDFParser hands to ShiftcareAutomation
+_CLIENT_DATA = {
+    'personal_info': {
+        'full_name': 'Mr. John Smith',
+        # Split once here so the form tests can fill them directly
+        'first_name': 'John',
+        'last_name': 'Smith',
+        'salutation': 'Mr',
+        'preferred_name': 'Johnny',
+        'gender': 'Male',
+        'ssn': '123-45-6789',
+        'date_of_birth': '05/15/1975',
+        'place_of_birth': 'Denver, Colorado',
+        'languages': 'English, Spanish',
+        'religion': 'Christian',
+        'marital_status': 'Married',
+        'nationality': 'American',
+        'ethnicity': 'Caucasian'
+    },
+    'contact_info': {
+        'phone': '(555) 123-4567',
+        'secondary_phone': '(555) 123-4568',
+        'email': 'john.smith@email.com',
+        'secondary_email': 'johnny.smith@gmail.com',
+        'address': '123 Main Street',
+        'unit_apartment': 'Apt 4B',
+        'postal_code': '80202',
+        'preferred_contact_method': 'Phone'
+    },
+    'emergency_contact': {
+        'name': 'Jane Smith',
+        'phone': '(555) 987-6543'
+    },
+    'medical_info': {
+        'conditions': 'Diabetes, Hypertension',
+        'medications': 'Metformin, Lisinopril'
+    }
+}
+
+_CARE_PLAN_DATA = {
+    'care_plan': {
+        'name': 'Initial Assessment',
+        'start_date': '10/25/2025',
+        'end_date': '11/25/2025'
+    },
+    'goals': [
+        {'description': 'Maintain blood sugar levels within normal range'},
+        {'description': 'Improve blood pressure control'},
+        {'description': 'Increase physical activity'},
+        {'description': 'Maintain medication compliance'}
+    ],
+    'tasks': [
+        {'description': 'Monitor blood glucose daily'},
+        {'description': 'Take medications as prescribed'},
+        {'description': 'Follow diabetic diet plan'},
+        {'description': 'Exercise 30 minutes daily'},
+        {'description': 'Attend monthly check-ups'},
+        {'description': 'Check blood pressure weekly'}
+    ]
+}
+
+_EMPLOYEE_DATA = {
+    'personal_info': {
+        'full_name': 'Dr. Sarah Johnson',
+        'first_name': 'Sarah',
+        'last_name': 'Johnson',
+        'salutation': 'Dr',
+        'gender': 'Female',
+        'date_of_birth': '03/22/1985'
+    },
+    'contact_info': {
+        'phone': '(555) 234-5678',
+        'email': 'sarah.johnson@email.com',
+        'address': '456 Oak Street, Denver, CO 80202'
+    },
+    'employment_info': {
+        'position': 'Registered Nurse',
+        'department': 'Home Care',
+        'employment_type': 'Full-time'
+    }
+}
+
+# Read-only and built once at import; take an editable_copy() to change one
+SAMPLE_CLIENT_DATA: Mapping[str, Any] = _freeze(_CLIENT_DATA)
+SAMPLE_CARE_PLAN_CLIENT_DATA: Mapping[str, Any] = _freeze({**_CLIENT_DATA, **_CARE_PLAN_DATA})
+SAMPLE_EMPLOYEE_DATA: Mapping[str, Any] = _freeze(_EMPLOYEE_DATA)
@@ -1,88 +1,373 @@
+import os
+import json
+import time
+import asyncio
+import contextlib
+import aiohttp
+import orjson
 import requests
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Optional, BinaryIO, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Chunk size used when streaming PDF bodies
+PDF_CHUNK_SIZE = 1 << 20
+
+# Refresh tokens this many seconds before GoFormz expires them
+TOKEN_EXPIRY_MARGIN = 60
+
+def _pdf_head_info(headers) -> Tuple[Optional[int], str, Optional[str]]:
+    """Pull size, type and validator out of PDF response headers"""
+    length = headers.get('Content-Length')
+    return (int(length) if length else None), headers.get('Content-Type', ''), headers.get('ETag')
+
 class GoFormzClient:
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str, max_concurrent_downloads: int = 8,
+                 token_cache_path: Optional[str] = None, api_version: str = 'v2'):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.base_url = "https://api.goformz.com/v2"
+        self.api_version = api_version
+        self.base_url = f"https://api.goformz.com/{api_version}"
+        
+        # Endpoint URLs are built once; per-call work is a single str.format
+        self._formz_url = f"{self.base_url}/formz"
+        self._search_url = f"{self._formz_url}/search"
+        self._form_url_tmpl = self._formz_url + '/{}'
+        self._pdf_url_tmpl = self._formz_url + '/{}/pdf'
+        self.token_url = "https://accounts.goformz.com/connect/token"
         self.access_token = None
+        self._token_expiry = 0.0
+        self._token_lock = threading.Lock()
+        # Optional file used to reuse a still-valid token across process restarts
+        self.token_cache_path = token_cache_path
+        
+        # Keep-alive connections are pooled and reused across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        # Offer every encoding urllib3 can decode (br/zstd only when their codecs are installed)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        
+        # Async counterparts, created lazily per running event loop since both are bound to the loop they are made in;
+        # the module-level client is also driven from separate asyncio.run loops by sync callers and tests
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self._aio_sessions: Dict[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, asyncio.Semaphore]] = {}
+        
+        # Form metadata is stable on the minute scale; the recent list changes faster
+        self._cache = TTLCache(maxsize=512, ttl=60)
+        self._recent_cache = TTLCache(maxsize=32, ttl=30)
+        self._cache_lock = threading.RLock()
+        
+        # Validators for conditional GETs of the recent-forms list, keyed by limit
+        self._etags: Dict[int, str] = {}
+        self._body_cache: Dict[int, list] = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    async def aclose(self):
+        """Close the async HTTP session of the running event loop"""
+        entry = self._aio_sessions.pop(asyncio.get_running_loop(), None)
+        if entry and not entry[0].closed:
+            await entry[0].close()
+    
+    def _aio_state(self) -> Tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        """Return the running loop's async session and download semaphore, creating them on first use in that loop"""
+        loop = asyncio.get_running_loop()
+        entry = self._aio_sessions.get(loop)
+        if entry is None or entry[0].closed:
+            # Sessions of loops that have since closed can no longer be closed themselves, only forgotten
+            for other in list(self._aio_sessions):
+                if other.is_closed():
+                    self._aio_sessions.pop(other, None)
+            connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+            semaphore = entry[1] if entry else asyncio.Semaphore(self.max_concurrent_downloads)
+            entry = (aiohttp.ClientSession(connector=connector), semaphore)
+            self._aio_sessions[loop] = entry
+        return entry
+    
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """Return the running loop's async session"""
+        return self._aio_state()[0]
         
+    def _cached(self, cache: TTLCache, key: tuple, fetch):
+        """Return cached value for key, calling fetch() on a miss"""
+        with self._cache_lock:
+            if key in cache:
+                return cache[key]
+        value = fetch()
+        with self._cache_lock:
+            cache[key] = value
+        return value
+    
+    def invalidate(self, form_id: Optional[str] = None) -> None:
+        """Drop cached data for a form (or everything) after it changes"""
+        with self._cache_lock:
+            if form_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(('details', form_id), None)
+            self._recent_cache.clear()
+            for key in [k for k in self._cache if k[0] == 'search']:
+                self._cache.pop(key, None)
+    
     def _get_access_token(self) -> str:
-        """Get OAuth2 access token"""
-        if self.access_token:
-            return self.access_token
+        """Get OAuth2 access token, refreshing it shortly before it expires"""
+        with self._token_lock:
+            if self.access_token and time.monotonic() < self._token_expiry:
+                return self.access_token
             
-        token_url = "https://accounts.goformz.com/connect/token"
-        data = {
-            'grant_type': 'client_credentials',
-            'client_id': self.client_id,
-            'client_secret': self.client_secret,
-            'scope': 'public_api'
-        }
-        
-        try:
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded'
+            if self._load_cached_token():
+                return self.access_token
+            
+            data = {
+                'grant_type': 'client_credentials',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'scope': 'public_api'
             }
-            response = requests.post(token_url, data=data, headers=headers)
-            response.raise_for_status()
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            return self.access_token
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get access token: {e}")
-            raise
+            
+            try:
+                headers = {
+                    'Content-Type': 'application/x-www-form-urlencoded'
+                }
+                response = self.session.post(self.token_url, data=data, headers=headers)
+                response.raise_for_status()
+                token_data = orjson.loads(response.content)
+                expires_in = token_data.get('expires_in', 3600)
+                self._set_access_token(token_data['access_token'], time.time() + expires_in)
+                self._store_cached_token(time.time() + expires_in)
+                return self.access_token
+            except requests.exceptions.RequestException as e:
+                logger.error("Failed to get access token: %s", e)
+                raise
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make authenticated request to GoFormz API"""
-        token = self._get_access_token()
-        headers = {
+    def _set_access_token(self, token: str, expires_at: float) -> None:
+        """Install a token given its wall-clock expiry time"""
+        self.access_token = token
+        self._token_expiry = time.monotonic() + (expires_at - time.time()) - TOKEN_EXPIRY_MARGIN
+        self.session.headers.update({
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
-        }
+        })
+    
+    def _reset_access_token(self) -> None:
+        """Forget the current token so the next request fetches a new one"""
+        with self._token_lock:
+            self.access_token = None
+            self._token_expiry = 0.0
+            if self.token_cache_path:
+                try:
+                    os.remove(self.token_cache_path)
+                except OSError:
+                    pass
+    
+    def _load_cached_token(self) -> bool:
+        """Reuse a persisted token for this client if it has not expired"""
+        if not self.token_cache_path:
+            return False
+        try:
+            with open(self.token_cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('client_id') != self.client_id:
+            return False
+        if cached.get('expires_at', 0) - TOKEN_EXPIRY_MARGIN <= time.time():
+            return False
+        self._set_access_token(cached['access_token'], cached['expires_at'])
+        return True
+    
+    def _store_cached_token(self, expires_at: float) -> None:
+        """Persist the current token so restarts can reuse it"""
+        if not self.token_cache_path:
+            return
+        payload = {'client_id': self.client_id, 'access_token': self.access_token, 'expires_at': expires_at}
+        tmp_path = f"{self.token_cache_path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.token_cache_path)
+        except OSError as e:
+            logger.warning("Could not persist access token: %s", e)
+    
+    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make authenticated request to GoFormz API"""
+        self._get_access_token()
         
-        url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, headers=headers, **kwargs)
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401:
+            # Token was revoked or expired early; fetch a new one and retry once
+            response.close()
+            self._reset_access_token()
+            self._get_access_token()
+            response = self.session.request(method, url, **kwargs)
         response.raise_for_status()
         return response
     
+    @contextlib.asynccontextmanager
+    async def _make_request_async(self, method: str, url: str, **kwargs):
+        """Make authenticated async request, refreshing the token once on 401"""
+        for attempt in range(2):
+            token = await asyncio.to_thread(self._get_access_token)
+            headers = {'Authorization': f'Bearer {token}'}
+            response = await self._get_aio_session().request(method, url, headers=headers, **kwargs)
+            if response.status == 401 and attempt == 0:
+                response.release()
+                self._reset_access_token()
+                continue
+            try:
+                response.raise_for_status()
+                yield response
+            finally:
+                response.release()
+            return
+    
     def get_recent_forms(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent forms from GoFormz"""
         try:
-            response = self._make_request('GET', f'/formz?limit={limit}')
-            return response.json().get('data', [])
+            return self._cached(
+                self._recent_cache, ('recent', limit),
+                lambda: self._fetch_recent_forms(limit)
+            )
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get forms: {e}")
+            logger.error("Failed to get forms: %s", e)
             raise
     
+    def _fetch_recent_forms(self, limit: int) -> List[Dict[str, Any]]:
+        """Fetch recent forms, revalidating with the last ETag to skip unchanged bodies"""
+        params = {'limit': limit}
+        headers = {}
+        with self._cache_lock:
+            etag = self._etags.get(limit)
+        if etag:
+            headers['If-None-Match'] = etag
+        
+        response = self._make_request('GET', self._formz_url, params=params, headers=headers)
+        if response.status_code == 304:
+            with self._cache_lock:
+                if limit in self._body_cache:
+                    return self._body_cache[limit]
+            # Validator without a stored body; fetch unconditionally
+            response = self._make_request('GET', self._formz_url, params=params)
+        
+        forms = orjson.loads(response.content).get('data', [])
+        new_etag = response.headers.get('ETag')
+        if new_etag:
+            with self._cache_lock:
+                self._etags[limit] = new_etag
+                self._body_cache[limit] = forms
+        return forms
+    
     def get_form_details(self, form_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific form"""
         try:
-            response = self._make_request('GET', f'/formz/{form_id}')
-            return response.json()
+            return self._cached(
+                self._cache, ('details', form_id),
+                lambda: orjson.loads(self._make_request('GET', self._form_url_tmpl.format(form_id)).content)
+            )
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get form details for {form_id}: {e}")
+            logger.error("Failed to get form details for %s: %s", form_id, e)
             raise
     
     def download_form_pdf(self, form_id: str) -> bytes:
         """Download PDF for a specific form"""
         try:
-            response = self._make_request('GET', f'/formz/{form_id}/pdf')
+            response = self._make_request('GET', self._pdf_url_tmpl.format(form_id))
             return response.content
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to download PDF for form {form_id}: {e}")
+            logger.error("Failed to download PDF for form %s: %s", form_id, e)
+            raise
+    
+    def head_form_pdf(self, form_id: str) -> Tuple[Optional[int], str, Optional[str]]:
+        """Return (content_length, content_type, etag) of a form's PDF without downloading it"""
+        try:
+            response = self._make_request('HEAD', self._pdf_url_tmpl.format(form_id))
+            return _pdf_head_info(response.headers)
+        except requests.exceptions.RequestException as e:
+            if e.response is not None and e.response.status_code == 405:
+                # HEAD not supported; nothing known until the body is fetched
+                return None, '', None
+            logger.error("Failed to check PDF for form %s: %s", form_id, e)
+            raise
+    
+    async def head_form_pdf_async(self, form_id: str) -> Tuple[Optional[int], str, Optional[str]]:
+        """Async counterpart of head_form_pdf"""
+        url = self._pdf_url_tmpl.format(form_id)
+        try:
+            async with self._make_request_async('HEAD', url) as response:
+                return _pdf_head_info(response.headers)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 405:
+                return None, '', None
+            logger.error("Failed to check PDF for form %s: %s", form_id, e)
+            raise
+        except aiohttp.ClientError as e:
+            logger.error("Failed to check PDF for form %s: %s", form_id, e)
+            raise
+    
+    def download_form_pdf_stream(self, form_id: str, sink: BinaryIO) -> None:
+        """Stream PDF for a specific form into a file-like sink"""
+        try:
+            with self._make_request('GET', self._pdf_url_tmpl.format(form_id), stream=True) as response:
+                logger.debug("PDF for form %s Content-Encoding: %s", form_id, response.headers.get('Content-Encoding'))
+                for chunk in response.iter_content(PDF_CHUNK_SIZE):
+                    sink.write(chunk)
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to download PDF for form %s: %s", form_id, e)
+            raise
+    
+    async def download_form_pdf_async(self, form_id: str) -> bytes:
+        """Download PDF for a specific form without blocking the event loop"""
+        url = self._pdf_url_tmpl.format(form_id)
+        try:
+            # Gate concurrent downloads to respect GoFormz rate limits
+            async with self._aio_state()[1]:
+                async with self._make_request_async('GET', url) as response:
+                    return await response.read()
+        except aiohttp.ClientError as e:
+            logger.error("Failed to download PDF for form %s: %s", form_id, e)
+            raise
+    
+    async def download_form_pdf_stream_async(self, form_id: str, sink: BinaryIO) -> None:
+        """Stream PDF for a specific form into a file-like sink without blocking the event loop"""
+        url = self._pdf_url_tmpl.format(form_id)
+        try:
+            async with self._aio_state()[1]:
+                async with self._make_request_async('GET', url) as response:
+                    logger.debug("PDF for form %s Content-Encoding: %s", form_id, response.headers.get('Content-Encoding'))
+                    async for chunk in response.content.iter_chunked(PDF_CHUNK_SIZE):
+                        sink.write(chunk)
+        except aiohttp.ClientError as e:
+            logger.error("Failed to download PDF for form %s: %s", form_id, e)
             raise
     
     def search_forms(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Search forms by query"""
         try:
             params = {'q': query, 'limit': limit}
-            response = self._make_request('GET', '/formz/search', params=params)
-            return response.json().get('data', [])
+            return self._cached(
+                self._cache, ('search', query, limit),
+                lambda: orjson.loads(self._make_request('GET', self._search_url, params=params).content).get('data', [])
+            )
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to search forms: {e}")
+            logger.error("Failed to search forms: %s", e)
             raise
@@ -1,418 +1,470 @@
 import PyPDF2
+import copy
+import hashlib
+import json
+import os
 import re
 import logging
-from typing import Dict, Any, Optional
+import mmap
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Optional, BinaryIO, Iterator, Union
 from io import BytesIO
+from functools import lru_cache
+from itertools import chain
+from cachetools import LRUCache
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# A PDF with no text on its first pages is a scan; the rest is not worth extracting
+SCAN_PROBE_PAGES = 2
+# Stamped on on-disk parse results; bump it when extraction changes so older results are ignored
+PARSE_CACHE_VERSION = 1
+
+def _open_mupdf(source: Union[bytes, str]):
+    """Open a PyMuPDF document from PDF bytes or a file path"""
+    return pymupdf.open(stream=source, filetype="pdf") if isinstance(source, bytes) else pymupdf.open(source)
+
+def _file_descriptor(pdf_file: BinaryIO) -> Optional[int]:
+    """OS file descriptor a file-like object is backed by, or None when it lives in memory"""
+    if isinstance(pdf_file, tempfile.SpooledTemporaryFile) and not pdf_file._rolled:
+        # fileno() would force a spool that still fits in memory out to disk
+        return None
+    try:
+        return pdf_file.fileno()
+    except (AttributeError, OSError):
+        return None
+
+def _iter_page_texts(source: Union[bytes, str, mmap.mmap]) -> Iterator[str]:
+    """Yield the text of each page, using PyMuPDF when it is installed and PyPDF2 otherwise"""
+    if pymupdf is None:
+        # PdfReader reads a memory map in place, like any other stream
+        yield from _iter_document_texts(PyPDF2.PdfReader(BytesIO(source) if isinstance(source, bytes) else source))
+        return
+    # Pages are extracted one at a time, lazily, so a scanned PDF can stop after its probe pages;
+    # PyMuPDF is not thread-safe, and parse_pdfs spreads separate PDFs across processes instead
+    if isinstance(source, mmap.mmap):
+        # The view is released once the document closes, so the map itself can be closed afterwards
+        with memoryview(source) as view, pymupdf.open(stream=view, filetype="pdf") as doc:
+            yield from _iter_document_texts(doc)
+        return
+    with _open_mupdf(source) as doc:
+        yield from _iter_document_texts(doc)
+
+def _iter_document_texts(document) -> Iterator[str]:
+    """Yield the text of each page of an open PyPDF2 reader or PyMuPDF document"""
+    if isinstance(document, PyPDF2.PdfReader):
+        for page in document.pages:
+            yield page.extract_text() or ""
+    else:
+        for page in document:
+            yield page.get_text("text")
+
+# RE2's \s and \d are ASCII-only; these match what re treats as whitespace/digits in str patterns
+_RE2_CLASSES = {
+    r'\s': r'\s\v\x{1c}-\x{1f}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}',
+    r'\d': r'\p{Nd}',
+}
+
+def _to_re2(pattern: str) -> str:
+    """Rewrite \\s and \\d so RE2 matches the same characters as re"""
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escape = pattern[i:i + 2]
+            body = _RE2_CLASSES.get(escape)
+            out.append(escape if body is None else body if in_class else f'[{body}]')
+            i += 2
+            continue
+        if char == '[' and not in_class:
+            in_class = True
+        elif char == ']' and in_class:
+            in_class = False
+        out.append(char)
+        i += 1
+    return ''.join(out)
+
+def _compile(pattern: str, flags: int = re.IGNORECASE, binary: bool = False):
+    """Compile with RE2 when it is installed, falling back to the re module"""
+    if re2 is not None:
+        # RE2 guarantees linear-time matching; its Python binding only takes inline flags
+        inline = ''.join(c for flag, c in ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm')) if flags & flag)
+        source = f'(?{inline}){_to_re2(pattern)}' if inline else _to_re2(pattern)
+        if binary:
+            # Matched against the UTF-8 encoded text, see _haystack()
+            return re2.compile(source.encode('utf-8'))
+        try:
+            return re2.compile(source)
+        except re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+def _haystack(text: str) -> Union[str, bytes]:
+    """Text for the binary patterns: UTF-8 bytes under RE2, which otherwise re-encodes it on every call"""
+    return text.encode('utf-8') if re2 is not None else text
+
+def _decode(value: Union[str, bytes]) -> str:
+    """Captured group from a binary pattern as str"""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+def _labels(labels) -> str:
+    """Alternation of labels, longest first so e.g. "Full Name" is preferred over "Name" at the same position"""
+    return '|'.join(sorted(labels, key=len, reverse=True))
+
+# Value shapes shared by several fields
+# Names start with a letter and stay on their line instead of running into the next label
+_NAME_VALUE = r'[A-Za-z][A-Za-z ,.\-]{0,79}'
+# Free-text values end at the line break but are capped, as PDF columns can run into one long line
+_LINE_VALUE = r'[^\n]{1,200}'
+_DATE_VALUE = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+_PHONE_VALUE = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+_EMAIL_VALUE = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+
+# Labelled fields as (section, key, labels, value); the first occurrence of each field wins
+_FIELDS = (
+    # Personal information
+    ('personal_info', 'full_name', ['Name', 'Full Name', 'Client Name', 'Employee Name', 'Patient Name'], _NAME_VALUE),
+    ('personal_info', 'preferred_name', ['Preferred Name', 'Nickname', 'Goes By'], _NAME_VALUE),
+    ('personal_info', 'date_of_birth', ['Date of Birth', 'DOB', 'Birth Date', 'Born'], _DATE_VALUE),
+    ('personal_info', 'ssn', ['SSN'], r'\d{3}-?\d{2}-?\d{4}'),
+    ('personal_info', 'gender', ['Gender', 'Sex'], r'Male|Female|Other|M|F'),
+    ('personal_info', 'place_of_birth', ['Place of Birth', 'Born in', 'Birth Place'], _LINE_VALUE),
+    ('personal_info', 'languages', ['Languages', 'Language', 'Speaks'], _LINE_VALUE),
+    ('personal_info', 'religion', ['Religion', 'Faith', 'Religious Affiliation'], _LINE_VALUE),
+    ('personal_info', 'marital_status', ['Marital Status', 'Status'], r'Single|Married|Divorced|Widowed|Separated'),
+    ('personal_info', 'nationality', ['Nationality', 'Citizenship', 'Country of Origin'], _LINE_VALUE),
+    ('personal_info', 'ethnicity', ['Ethnicity', 'Ethnic Background', 'Race'], _LINE_VALUE),
+    # Contact information
+    ('contact_info', 'phone', ['Phone', 'Mobile', 'Cell', 'Primary Phone'], _PHONE_VALUE),
+    ('contact_info', 'secondary_phone', ['Secondary Phone', 'Home Phone', 'Work Phone'], _PHONE_VALUE),
+    ('contact_info', 'email', ['Email', 'Primary Email', 'E-mail'], _EMAIL_VALUE),
+    ('contact_info', 'secondary_email', ['Secondary Email'], _EMAIL_VALUE),
+    ('contact_info', 'address', ['Address', 'Street Address', 'Home Address', 'Primary Address'], r'[^\n]{1,150}'),
+    ('contact_info', 'unit_apartment', ['Unit', 'Apartment', 'Apt', 'Suite'], _LINE_VALUE),
+    ('contact_info', 'postal_code', ['Postal Code', 'Zip Code', 'ZIP', 'Postcode'], _LINE_VALUE),
+    ('contact_info', 'preferred_contact_method', ['Preferred Contact', 'Contact Method', 'Best Way to Contact'],
+     r'Phone|Email|Text|SMS|Mail'),
+    # Emergency contact
+    ('emergency_contact', 'name', ['Emergency Contact'], _NAME_VALUE),
+    ('emergency_contact', 'phone', ['Emergency Phone'], _PHONE_VALUE),
+    # Medical information
+    ('medical_info', 'conditions', ['Medical Conditions'], _LINE_VALUE),
+    ('medical_info', 'medications', ['Medications'], _LINE_VALUE),
+    # Employment information
+    ('employment_info', 'position', ['Position', 'Title', 'Job Title', 'Role'], _LINE_VALUE),
+    ('employment_info', 'department', ['Department'], _LINE_VALUE),
+    ('employment_info', 'employment_type', ['Employment Type', 'Type', 'Status'],
+     r'Full-time|Part-time|Casual|Contract|Temporary'),
+    # Care plan
+    ('care_plan', 'name', ['Care Plan', 'Plan Name', 'Assessment', 'Treatment Plan'], _LINE_VALUE),
+    ('care_plan', 'start_date', ['Start Date', 'Plan Start', 'Effective Date'], _DATE_VALUE),
+    ('care_plan', 'end_date', ['End Date', 'Plan End', 'Review Date'], _DATE_VALUE),
+)
+
+_FIELD_SECTIONS = ('personal_info', 'contact_info', 'emergency_contact', 'medical_info', 'employment_info', 'care_plan')
+
+# Lowercased labels of each field, longest first, and the value that must follow them
+_FIELD_LABELS = tuple(sorted((label.lower() for label in labels), key=len, reverse=True) for _, _, labels, _ in _FIELDS)
+# A label is followed by a colon and/or a bounded run of whitespace before its value
+_LABEL_SEPARATOR = r'[:\s]{1,16}'
+_FIELD_VALUES = tuple(_compile(rf'{_LABEL_SEPARATOR}({value})') for _, _, _, value in _FIELDS)
+# Values are matched inside a bounded window after their label rather than against the rest of the text
+_VALUE_WINDOW = 256
+
+_SALUTATION_PATTERN = _compile(
+    r'(?:Title|Salutation)[:\s]{1,16}(Mr|Mrs|Ms|Dr|Prof)|(Mr|Mrs|Ms|Dr|Prof)\.?\s+[A-Za-z\s]',
+    re.IGNORECASE, binary=True
+)
+
+# Tasks and goals
+_TASK_LABELS = ['Task', 'Activity', 'Action', 'To Do', 'Care Task', 'Service']
+_TASK_PATTERN = _compile(rf'(?:{_labels(_TASK_LABELS)})[:\s]+({_LINE_VALUE})', binary=True)
+_NUMBERED_TASK_PATTERN = _compile(rf'^\d+[\.\)]\s*({_LINE_VALUE})', re.MULTILINE, binary=True)
+# Hyphen, asterisk, bullet, middle dot and black circle; escaped so the source stays ASCII
+_BULLET_PATTERN = _compile('^[-*\u2022\u00b7\u25cf]' + rf'\s*({_LINE_VALUE})', re.MULTILINE, binary=True)
+_GOAL_LABELS = ['Goal', 'Objective', 'Target', 'Aim', 'Outcome', 'Care Goal']
+_GOAL_PATTERN = _compile(rf'(?:{_labels(_GOAL_LABELS)})[:\s]+({_LINE_VALUE})', binary=True)
+_GOAL_SECTION_PATTERN = _compile(
+    rf'(?:Goals?|Objectives?|Targets?)[:\s]*\n({_LINE_VALUE}(?:\n{_LINE_VALUE})*)', re.IGNORECASE | re.MULTILINE, binary=True
+)
+
+# Lowercased label -> what it can introduce: a _FIELDS index, 'tasks' or 'goals'
+_LABEL_INDEX: Dict[str, set] = {}
+for _key, _labelled in [*enumerate(field[2] for field in _FIELDS), ('tasks', _TASK_LABELS), ('goals', _GOAL_LABELS)]:
+    for _label in _labelled:
+        _LABEL_INDEX.setdefault(_label.lower(), set()).add(_key)
+
+def _lower_aligned(text: str) -> str:
+    """Lowercase text so that every index still points at the same character"""
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        # A few characters (e.g. "\u0130") lowercase to two; keep their first so offsets line up
+        text_lower = ''.join(char.lower()[0] for char in text)
+    return text_lower
+
+# Built once per word set and shared by every PDFParser; matching never mutates it
+@lru_cache(maxsize=8)
+def _build_automaton(words: frozenset):
+    """Aho-Corasick automaton over words, or None when pyahocorasick is not installed"""
+    if ahocorasick is None or not words:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+def _first_offsets(text_lower: str, words, automaton) -> Dict[str, int]:
+    """Return the first offset of each of words that appears in the lowercased text"""
+    offsets = {}
+    if automaton is None:
+        for word in words:
+            index = text_lower.find(word)
+            if index != -1:
+                offsets[word] = index
+        return offsets
+    # One pass finds every word, however many there are, instead of one str.find per word
+    for end, word in automaton.iter(text_lower):
+        if word not in offsets:
+            offsets[word] = end - len(word) + 1
+            if len(offsets) == len(words):
+                break
+    return offsets
+
 class PDFParser:
-    def __init__(self):
-        self.client_keywords = ['client', 'customer', 'patient', 'resident']
-        self.employee_keywords = ['employee', 'staff', 'worker', 'caregiver']
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.client_keywords = ('client', 'customer', 'patient', 'resident')
+        self.employee_keywords = ('employee', 'staff', 'worker', 'caregiver')
+        self.packet_indicators = {'employee': ('employee packet', 'staff packet'), 'client': ('client packet', 'patient packet')}
+        # Packet keywords alone are enough to tell the packet type from text without extracting fields
+        self._packet_words = frozenset(
+            {*self.client_keywords, *self.employee_keywords, *sum(self.packet_indicators.values(), ())}
+        )
+        self._packet_automaton = _build_automaton(self._packet_words)
+        # Field labels and packet keywords are found together in a single pass over the text
+        self._scan_words = frozenset({*_LABEL_INDEX, *self._packet_words})
+        self._scan_automaton = _build_automaton(self._scan_words)
+        # Parsed results keyed by a digest of the PDF bytes, so re-sent PDFs are not parsed again
+        self._parse_cache = LRUCache(maxsize=128)
+        self._parse_cache_lock = threading.Lock()
+        # Optional directory keeping parsed results by the same digest across restarts
+        self.cache_dir = cache_dir
+        # Extracted data keyed by a digest of the text, so unchanged text is not extracted again
+        self._text_cache = LRUCache(maxsize=128)
+        self._text_cache_lock = threading.Lock()
     
-    def parse_pdf(self, pdf_data: bytes) -> Dict[str, Any]:
-        """Parse PDF and extract structured data"""
+    def parse_pdf(self, pdf_data: Union[bytes, BinaryIO, str, os.PathLike]) -> Dict[str, Any]:
+        """Parse PDF (raw bytes, a readable file-like object or a file path) and extract structured data"""
         try:
-            pdf_file = BytesIO(pdf_data)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            # Extract text from all pages
-            full_text = ""
-            for page in pdf_reader.pages:
-                full_text += page.extract_text() + "\n"
-            
-            # Parse the text to extract structured data
-            parsed_data = self._extract_data_from_text(full_text)
-            
-            return parsed_data
+            if isinstance(pdf_data, (str, os.PathLike)):
+                # Files on disk are hashed through a memory map and opened by path, never read into memory
+                source = os.fspath(pdf_data)
+                with open(source, 'rb') as pdf_file, mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest = hashlib.blake2b(mapped, digest_size=16).digest()
+                return self._parse_source(digest, source)
+            fd = _file_descriptor(pdf_data) if hasattr(pdf_data, 'read') else None
+            if fd is not None:
+                # Spooled files that have rolled over to disk are hashed and parsed through a memory map in the same way
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                    return self._parse_source(hashlib.blake2b(mapped, digest_size=16).digest(), mapped)
+            # Only input that is already in memory is read into one bytes object
+            source = pdf_data.read() if hasattr(pdf_data, 'read') else bytes(pdf_data)
+            return self._parse_source(hashlib.blake2b(source, digest_size=16).digest(), source)
             
         except Exception as e:
             logger.error(f"Error parsing PDF: {e}")
             raise
     
+    def _parse_source(self, digest: bytes, source: Union[bytes, str, mmap.mmap]) -> Dict[str, Any]:
+        """Parse PDF bytes, a file path or a memory map, reusing an earlier result for the same digest"""
+        with self._parse_cache_lock:
+            cached = self._parse_cache.get(digest)
+        if cached is None:
+            cached = self._load_cached_parse(digest)
+            if cached is None:
+                cached = self._parse_page_texts(_iter_page_texts(source))
+                self._store_cached_parse(digest, cached)
+            with self._parse_cache_lock:
+                self._parse_cache[digest] = cached
+        # Callers get their own copy so they cannot alter the cached result
+        return copy.deepcopy(cached)
+    
+    def _cache_file(self, digest: bytes) -> str:
+        """Path of the on-disk parse result for a PDF digest"""
+        return os.path.join(self.cache_dir, f"{digest.hex()}.json")
+    
+    def _load_cached_parse(self, digest: bytes) -> Optional[Dict[str, Any]]:
+        """Parsed data persisted by an earlier run for this PDF, if the cache directory has it"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_file(digest)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get('version') != PARSE_CACHE_VERSION:
+            return None
+        return cached.get('data')
+    
+    def _store_cached_parse(self, digest: bytes, data: Dict[str, Any]) -> None:
+        """Persist parsed data so later runs can skip parsing the same PDF"""
+        if not self.cache_dir:
+            return
+        payload = {'version': PARSE_CACHE_VERSION, 'data': data}
+        try:
+            # Packets hold personal and medical details, so the directory and files are private to this user;
+            # a unique temporary name keeps concurrent writers of the same PDF from clobbering each other
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, self._cache_file(digest))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not persist parsed PDF: {e}")
+    
+    def parse_pdfs(self, pdfs: Iterable[Union[bytes, str, os.PathLike]], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Parse many PDFs (bytes or file paths) across worker processes, yielding results in input order"""
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(self.cache_dir,)) as executor:
+            yield from executor.map(_parse_one, pdfs, chunksize=4)
+    
+    def parse_document(self, document) -> Dict[str, Any]:
+        """Parse an already opened PyPDF2 PdfReader or PyMuPDF document without reopening it"""
+        try:
+            return self._parse_page_texts(_iter_document_texts(document))
+        except Exception as e:
+            logger.error(f"Error parsing PDF document: {e}")
+            raise
+    
+    def _parse_page_texts(self, page_texts: Iterator[str]) -> Dict[str, Any]:
+        """Join the text of each page and parse it into structured data"""
+        # Extract text from all pages; joining once avoids quadratic string rebuilding
+        parts = []
+        for index, page_text in enumerate(page_texts):
+            if index == SCAN_PROBE_PAGES and not any(part.strip() for part in parts):
+                logger.info(f"No text on the first {SCAN_PROBE_PAGES} pages, treating PDF as scanned")
+                break
+            parts.append(page_text)
+            parts.append("\n")
+        full_text = "".join(parts)
+        
+        # Parse the text to extract structured data
+        return self._extract_data_from_text(full_text)
+    
     def _extract_data_from_text(self, text: str) -> Dict[str, Any]:
+        """Extract structured data from PDF text, reusing the result for text seen before"""
+        # surrogatepass lets text with lone surrogates from broken PDF text maps be hashed too
+        digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._text_cache_lock:
+            cached = self._text_cache.get(digest)
+        if cached is None:
+            cached = self._parse_text(text)
+            with self._text_cache_lock:
+                self._text_cache[digest] = cached
+        # Callers get their own copy so they cannot alter the cached result
+        return copy.deepcopy(cached)
+    
+    def _parse_text(self, text: str) -> Dict[str, Any]:
         """Extract structured data from PDF text"""
+        if re2 is not None:
+            # RE2 matches over UTF-8, which cannot encode lone surrogates from broken PDF text maps
+            text = text.encode('utf-8', 'replace').decode('utf-8')
+        
+        text_lower = _lower_aligned(text)
+        found = _first_offsets(text_lower, self._scan_words, self._scan_automaton)
+        # Fields whose labels never occur are skipped without scanning
+        positions = {label: offset for label, offset in found.items() if label in _LABEL_INDEX}
+        present = set().union(*(_LABEL_INDEX[label] for label in positions))
+        fields = self._extract_fields(text, text_lower, positions)
+        
         data = {
-            'raw_text': text,
-            'personal_info': {},
-            'contact_info': {},
-            'emergency_contact': {},
-            'medical_info': {},
-            'employment_info': {},
+            # Only the packet-type signals are kept, not the text itself
+            '_packet_signals': self._packet_signals(found),
+            'personal_info': fields['personal_info'],
+            'contact_info': fields['contact_info'],
+            'emergency_contact': fields['emergency_contact'],
+            'medical_info': fields['medical_info'],
+            'employment_info': fields['employment_info'],
             'other_info': {}
         }
-        
-        # Extract personal information
-        data['personal_info'] = self._extract_personal_info(text)
-        
-        # Extract contact information
-        data['contact_info'] = self._extract_contact_info(text)
-        
-        # Extract emergency contact
-        data['emergency_contact'] = self._extract_emergency_contact(text)
-        
-        # Extract medical information
-        data['medical_info'] = self._extract_medical_info(text)
-        
-        # Extract employment information
-        data['employment_info'] = self._extract_employment_info(text)
+        haystack = _haystack(text)
+        self._normalize_personal_info(data['personal_info'], haystack)
+        self._infer_employment_type(data['employment_info'], text_lower)
         
         # Extract care plan information (tasks, goals, etc.)
-        data['care_plan'] = self._extract_care_plan_info(text)
-        data['tasks'] = self._extract_tasks(text)
-        data['goals'] = self._extract_goals(text)
+        data['care_plan'] = fields['care_plan']
+        data['tasks'] = self._extract_tasks(haystack, present)
+        data['goals'] = self._extract_goals(haystack, present)
         
         return data
     
-    def _extract_personal_info(self, text: str) -> Dict[str, str]:
-        """Extract personal information like name, DOB, SSN"""
-        info = {}
-        
-        # Name patterns
-        name_patterns = [
-            r'Name[:\s]+([A-Za-z\s,.-]+)',
-            r'Full Name[:\s]+([A-Za-z\s,.-]+)',
-            r'Client Name[:\s]+([A-Za-z\s,.-]+)',
-            r'Employee Name[:\s]+([A-Za-z\s,.-]+)',
-            r'Patient Name[:\s]+([A-Za-z\s,.-]+)'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['full_name'] = match.group(1).strip()
-                break
-        
-        # Preferred Name
-        preferred_name_patterns = [
-            r'Preferred Name[:\s]+([A-Za-z\s,.-]+)',
-            r'Nickname[:\s]+([A-Za-z\s,.-]+)',
-            r'Goes By[:\s]+([A-Za-z\s,.-]+)'
-        ]
-        
-        for pattern in preferred_name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['preferred_name'] = match.group(1).strip()
-                break
-        
-        # Date of Birth
-        dob_patterns = [
-            r'Date of Birth[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'DOB[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Birth Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Born[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-        ]
-        
-        for pattern in dob_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['date_of_birth'] = match.group(1).strip()
-                break
-        
-        # Social Security Number
-        ssn_pattern = r'SSN[:\s]+(\d{3}-?\d{2}-?\d{4})'
-        match = re.search(ssn_pattern, text, re.IGNORECASE)
-        if match:
-            info['ssn'] = match.group(1).strip()
-        
-        # Gender
-        gender_patterns = [
-            r'Gender[:\s]+(Male|Female|Other)',
-            r'Sex[:\s]+(Male|Female|Other)',
-            r'Gender[:\s]+(M|F)',
-            r'Sex[:\s]+(M|F)'
-        ]
-        
-        for pattern in gender_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                gender = match.group(1).strip()
-                # Convert M/F to full words
-                if gender.upper() == 'M':
-                    info['gender'] = 'Male'
-                elif gender.upper() == 'F':
-                    info['gender'] = 'Female'
+    def _extract_fields(self, text: str, text_lower: str, positions: Dict[str, int]) -> Dict[str, Dict[str, str]]:
+        """Extract every labelled field by locating its labels in the lowercased text"""
+        found = {}
+        for index, labels in enumerate(_FIELD_LABELS):
+            # Next offset of each label; the earliest is tried first, longest label first on a tie
+            heads = {label: positions[label] for label in labels if label in positions}
+            while heads:
+                label = min(heads, key=lambda candidate: (heads[candidate], -len(candidate)))
+                start = heads[label]
+                end = start + len(label)
+                match = _FIELD_VALUES[index].match(text[end:end + _VALUE_WINDOW])
+                if match:
+                    found[index] = match.group(1).strip()
+                    break
+                start = text_lower.find(label, start + 1)
+                if start == -1:
+                    del heads[label]
                 else:
-                    info['gender'] = gender
-                break
-        
-        # Salutation (Mr, Mrs, Ms, Dr, etc.)
-        salutation_patterns = [
-            r'(Mr|Mrs|Ms|Dr|Prof)\.?\s+([A-Za-z\s]+)',
-            r'Title[:\s]+(Mr|Mrs|Ms|Dr|Prof)',
-            r'Salutation[:\s]+(Mr|Mrs|Ms|Dr|Prof)'
-        ]
-        
-        for pattern in salutation_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['salutation'] = match.group(1).strip()
-                break
-        
-        # Place of Birth
-        place_of_birth_patterns = [
-            r'Place of Birth[:\s]+([^\n]+)',
-            r'Born in[:\s]+([^\n]+)',
-            r'Birth Place[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in place_of_birth_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['place_of_birth'] = match.group(1).strip()
-                break
-        
-        # Languages
-        languages_patterns = [
-            r'Languages[:\s]+([^\n]+)',
-            r'Language[:\s]+([^\n]+)',
-            r'Speaks[:\s]+([^\n]+)'
-        ]
+                    heads[label] = start
         
-        for pattern in languages_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['languages'] = match.group(1).strip()
-                break
-        
-        # Religion
-        religion_patterns = [
-            r'Religion[:\s]+([^\n]+)',
-            r'Faith[:\s]+([^\n]+)',
-            r'Religious Affiliation[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in religion_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['religion'] = match.group(1).strip()
-                break
-        
-        # Marital Status
-        marital_patterns = [
-            r'Marital Status[:\s]+(Single|Married|Divorced|Widowed|Separated)',
-            r'Status[:\s]+(Single|Married|Divorced|Widowed|Separated)'
-        ]
-        
-        for pattern in marital_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['marital_status'] = match.group(1).strip()
-                break
-        
-        # Nationality
-        nationality_patterns = [
-            r'Nationality[:\s]+([^\n]+)',
-            r'Citizenship[:\s]+([^\n]+)',
-            r'Country of Origin[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in nationality_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['nationality'] = match.group(1).strip()
-                break
-        
-        # Ethnicity
-        ethnicity_patterns = [
-            r'Ethnicity[:\s]+([^\n]+)',
-            r'Ethnic Background[:\s]+([^\n]+)',
-            r'Race[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in ethnicity_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['ethnicity'] = match.group(1).strip()
-                break
-        
-        return info
+        sections = {section: {} for section in _FIELD_SECTIONS}
+        for index, (section, key, _, _) in enumerate(_FIELDS):
+            if index in found:
+                sections[section][key] = found[index]
+        return sections
     
-    def _extract_contact_info(self, text: str) -> Dict[str, str]:
-        """Extract contact information"""
-        info = {}
-        
-        # Phone numbers
-        phone_patterns = [
-            r'Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
-            r'Mobile[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
-            r'Cell[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
-            r'Primary Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
-        ]
-        
-        for pattern in phone_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['phone'] = match.group(1).strip()
-                break
-        
-        # Secondary Phone
-        secondary_phone_patterns = [
-            r'Secondary Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
-            r'Home Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
-            r'Work Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
-        ]
-        
-        for pattern in secondary_phone_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['secondary_phone'] = match.group(1).strip()
-                break
-        
-        # Email
-        email_patterns = [
-            r'Email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'Primary Email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'E-mail[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        ]
-        
-        for pattern in email_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['email'] = match.group(1).strip()
-                break
-        
-        # Secondary Email
-        secondary_email_pattern = r'Secondary Email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        match = re.search(secondary_email_pattern, text, re.IGNORECASE)
-        if match:
-            info['secondary_email'] = match.group(1).strip()
-        
-        # Address
-        address_patterns = [
-            r'Address[:\s]+([^\n]+)',
-            r'Street Address[:\s]+([^\n]+)',
-            r'Home Address[:\s]+([^\n]+)',
-            r'Primary Address[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in address_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['address'] = match.group(1).strip()
-                break
-        
-        # Unit/Apartment Number
-        unit_patterns = [
-            r'Unit[:\s]+([^\n]+)',
-            r'Apartment[:\s]+([^\n]+)',
-            r'Apt[:\s]+([^\n]+)',
-            r'Suite[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in unit_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['unit_apartment'] = match.group(1).strip()
-                break
+    def _normalize_personal_info(self, info: Dict[str, str], haystack: Union[str, bytes]) -> None:
+        """Expand M/F gender codes and add the salutation"""
+        # Convert M/F to full words
+        gender = info.get('gender', '')
+        if gender.upper() == 'M':
+            info['gender'] = 'Male'
+        elif gender.upper() == 'F':
+            info['gender'] = 'Female'
         
-        # Postal Code
-        postal_patterns = [
-            r'Postal Code[:\s]+([^\n]+)',
-            r'Zip Code[:\s]+([^\n]+)',
-            r'ZIP[:\s]+([^\n]+)',
-            r'Postcode[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in postal_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['postal_code'] = match.group(1).strip()
-                break
-        
-        # Preferred Contact Method
-        contact_method_patterns = [
-            r'Preferred Contact[:\s]+(Phone|Email|Text|SMS|Mail)',
-            r'Contact Method[:\s]+(Phone|Email|Text|SMS|Mail)',
-            r'Best Way to Contact[:\s]+(Phone|Email|Text|SMS|Mail)'
-        ]
-        
-        for pattern in contact_method_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['preferred_contact_method'] = match.group(1).strip()
-                break
-        
-        return info
-    
-    def _extract_emergency_contact(self, text: str) -> Dict[str, str]:
-        """Extract emergency contact information"""
-        info = {}
-        
-        # Emergency contact name
-        ec_name_pattern = r'Emergency Contact[:\s]+([A-Za-z\s,.-]+)'
-        match = re.search(ec_name_pattern, text, re.IGNORECASE)
-        if match:
-            info['name'] = match.group(1).strip()
-        
-        # Emergency contact phone
-        ec_phone_pattern = r'Emergency Phone[:\s]+(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
-        match = re.search(ec_phone_pattern, text, re.IGNORECASE)
-        if match:
-            info['phone'] = match.group(1).strip()
-        
-        return info
-    
-    def _extract_medical_info(self, text: str) -> Dict[str, str]:
-        """Extract medical information"""
-        info = {}
-        
-        # Medical conditions
-        conditions_pattern = r'Medical Conditions[:\s]+([^\n]+)'
-        match = re.search(conditions_pattern, text, re.IGNORECASE)
-        if match:
-            info['conditions'] = match.group(1).strip()
-        
-        # Medications
-        medications_pattern = r'Medications[:\s]+([^\n]+)'
-        match = re.search(medications_pattern, text, re.IGNORECASE)
+        # Salutation (Mr, Mrs, Ms, Dr, etc.)
+        match = _SALUTATION_PATTERN.search(haystack)
         if match:
-            info['medications'] = match.group(1).strip()
-        
-        return info
+            # Labelled and inline forms capture into different groups
+            info['salutation'] = _decode(match.group(match.lastindex)).strip()
     
-    def _extract_employment_info(self, text: str) -> Dict[str, str]:
-        """Extract employment information"""
-        info = {}
-        
-        # Position/Title
-        position_patterns = [
-            r'Position[:\s]+([^\n]+)',
-            r'Title[:\s]+([^\n]+)',
-            r'Job Title[:\s]+([^\n]+)',
-            r'Role[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in position_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['position'] = match.group(1).strip()
-                break
-        
-        # Department
-        dept_pattern = r'Department[:\s]+([^\n]+)'
-        match = re.search(dept_pattern, text, re.IGNORECASE)
-        if match:
-            info['department'] = match.group(1).strip()
-        
-        # Employment Type
-        employment_type_patterns = [
-            r'Employment Type[:\s]+(Full-time|Part-time|Casual|Contract|Temporary)',
-            r'Type[:\s]+(Full-time|Part-time|Casual|Contract|Temporary)',
-            r'Status[:\s]+(Full-time|Part-time|Casual|Contract|Temporary)'
-        ]
-        
-        for pattern in employment_type_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['employment_type'] = match.group(1).strip()
-                break
-        
-        # If no employment type found, try to infer from context
+    def _infer_employment_type(self, info: Dict[str, str], text_lower: str) -> None:
+        """Infer the employment type from context when no labelled value was found"""
         if not info.get('employment_type'):
-            text_lower = text.lower()
             if 'casual' in text_lower:
                 info['employment_type'] = 'Casual'
             elif 'part-time' in text_lower or 'part time' in text_lower:
@@ -421,168 +473,102 @@ class PDFParser:
                 info['employment_type'] = 'Full-time'
             else:
                 info['employment_type'] = 'Casual'  # Default
-        
-        return info
     
-    def _extract_care_plan_info(self, text: str) -> Dict[str, str]:
-        """Extract care plan information"""
-        info = {}
-        
-        # Care plan name/title
-        care_plan_patterns = [
-            r'Care Plan[:\s]+([^\n]+)',
-            r'Plan Name[:\s]+([^\n]+)',
-            r'Assessment[:\s]+([^\n]+)',
-            r'Treatment Plan[:\s]+([^\n]+)'
-        ]
-        
-        for pattern in care_plan_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['name'] = match.group(1).strip()
-                break
-        
-        # Start date
-        start_date_patterns = [
-            r'Start Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Plan Start[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Effective Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-        ]
-        
-        for pattern in start_date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['start_date'] = match.group(1).strip()
-                break
-        
-        # End date
-        end_date_patterns = [
-            r'End Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Plan End[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'Review Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-        ]
-        
-        for pattern in end_date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['end_date'] = match.group(1).strip()
-                break
-        
-        return info
-    
-    def _extract_tasks(self, text: str) -> list:
+    def _extract_tasks(self, haystack: Union[str, bytes], present: set) -> list:
         """Extract tasks from the PDF"""
-        tasks = []
-        
-        # Look for task patterns
-        task_patterns = [
-            r'Task[:\s]+([^\n]+)',
-            r'Activity[:\s]+([^\n]+)',
-            r'Action[:\s]+([^\n]+)',
-            r'To Do[:\s]+([^\n]+)',
-            r'Care Task[:\s]+([^\n]+)',
-            r'Service[:\s]+([^\n]+)'
-        ]
+        # Labelled tasks, then numbered lists and bullet points that might be tasks
+        patterns = [_NUMBERED_TASK_PATTERN, _BULLET_PATTERN]
+        if 'tasks' in present:
+            patterns.insert(0, _TASK_PATTERN)
         
-        for pattern in task_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                task_text = match.strip()
-                if task_text and len(task_text) > 3:  # Filter out very short matches
+        tasks = []
+        seen = set()  # A line matched by several patterns is only listed once
+        for pattern in patterns:
+            for match in pattern.finditer(haystack):
+                task_text = _decode(match.group(1)).strip()
+                key = task_text.lower()
+                if len(task_text) > 3 and key not in seen:  # Filter out very short matches
+                    seen.add(key)
                     tasks.append({
                         'description': task_text,
                         'type': 'task'
                     })
         
-        # Look for numbered lists that might be tasks
-        numbered_task_pattern = r'^\d+[\.\)]\s*([^\n]+)'
-        matches = re.findall(numbered_task_pattern, text, re.MULTILINE)
-        for match in matches:
-            task_text = match.strip()
-            if task_text and len(task_text) > 3:
-                tasks.append({
-                    'description': task_text,
-                    'type': 'task'
-                })
-        
-        # Look for bullet points that might be tasks
-        bullet_pattern = r'^[-•*]\s*([^\n]+)'
-        matches = re.findall(bullet_pattern, text, re.MULTILINE)
-        for match in matches:
-            task_text = match.strip()
-            if task_text and len(task_text) > 3:
-                tasks.append({
-                    'description': task_text,
-                    'type': 'task'
-                })
-        
         return tasks
     
-    def _extract_goals(self, text: str) -> list:
+    def _extract_goals(self, haystack: Union[str, bytes], present: set) -> list:
         """Extract goals from the PDF"""
-        goals = []
-        
-        # Look for goal patterns
-        goal_patterns = [
-            r'Goal[:\s]+([^\n]+)',
-            r'Objective[:\s]+([^\n]+)',
-            r'Target[:\s]+([^\n]+)',
-            r'Aim[:\s]+([^\n]+)',
-            r'Outcome[:\s]+([^\n]+)',
-            r'Care Goal[:\s]+([^\n]+)'
-        ]
+        # Goal section headings contain a goal label, so neither pass can match when the scan found none
+        if 'goals' not in present:
+            return []
         
-        for pattern in goal_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                goal_text = match.strip()
-                if goal_text and len(goal_text) > 3:  # Filter out very short matches
-                    goals.append({
-                        'description': goal_text,
-                        'type': 'goal'
-                    })
+        # Labelled goals, then each line of sections that might contain goals, matched lazily
+        candidates = chain(
+            (_decode(match.group(1)) for match in _GOAL_PATTERN.finditer(haystack)),
+            (line for match in _GOAL_SECTION_PATTERN.finditer(haystack) for line in _decode(match.group(1)).strip().split('\n')),
+        )
         
-        # Look for sections that might contain goals
-        goal_section_patterns = [
-            r'Goals?[:\s]*\n([^\n]+(?:\n[^\n]+)*)',
-            r'Objectives?[:\s]*\n([^\n]+(?:\n[^\n]+)*)',
-            r'Targets?[:\s]*\n([^\n]+(?:\n[^\n]+)*)'
-        ]
-        
-        for pattern in goal_section_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                # Split the match into individual goals
-                lines = match.strip().split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and len(line) > 3:
-                        goals.append({
-                            'description': line,
-                            'type': 'goal'
-                        })
+        goals = []
+        seen = set()
+        for goal_text in candidates:
+            goal_text = goal_text.strip()
+            key = goal_text.lower()
+            if len(goal_text) > 3 and key not in seen:  # Filter out very short matches
+                seen.add(key)
+                goals.append({
+                    'description': goal_text,
+                    'type': 'goal'
+                })
         
         return goals
     
+    def _packet_signals(self, found: Dict[str, int]) -> Dict[str, Any]:
+        """Keyword scores and packet indicators that determine_packet_type decides on, from the scanned words"""
+        return {
+            'client_score': sum(1 for keyword in self.client_keywords if keyword in found),
+            'employee_score': sum(1 for keyword in self.employee_keywords if keyword in found),
+            'is_employee_packet': any(indicator in found for indicator in self.packet_indicators['employee']),
+            'is_client_packet': any(indicator in found for indicator in self.packet_indicators['client']),
+        }
+    
     def determine_packet_type(self, parsed_data: Dict[str, Any]) -> str:
         """Determine if this is a client or employee packet"""
-        text = parsed_data.get('raw_text', '').lower()
-        
-        # Count keyword occurrences
-        client_score = sum(1 for keyword in self.client_keywords if keyword in text)
-        employee_score = sum(1 for keyword in self.employee_keywords if keyword in text)
-        
+        signals = parsed_data.get('_packet_signals')
+        if signals is None:
+            # Hand-built data may carry the text instead of precomputed signals
+            return self.determine_packet_type_from_text(parsed_data.get('raw_text', ''))
+        return self._packet_type(signals)
+    
+    def determine_packet_type_from_text(self, text: str) -> str:
+        """Client or employee straight from packet text, scanning for the packet keywords only"""
+        found = _first_offsets(_lower_aligned(text), self._packet_words, self._packet_automaton)
+        return self._packet_type(self._packet_signals(found))
+    
+    def _packet_type(self, signals: Dict[str, Any]) -> str:
+        """Decide the packet type from its signals"""
         # Check for specific indicators
-        if 'employee packet' in text or 'staff packet' in text:
+        if signals['is_employee_packet']:
             return 'employee'
-        elif 'client packet' in text or 'patient packet' in text:
+        elif signals['is_client_packet']:
             return 'client'
         
         # Use keyword scoring
-        if employee_score > client_score:
+        if signals['employee_score'] > signals['client_score']:
             return 'employee'
-        elif client_score > employee_score:
+        elif signals['client_score'] > signals['employee_score']:
             return 'client'
         else:
             # Default to client if unclear
             return 'client'
+
+# Parser used by parse_pdfs worker processes, created when each process starts
+_worker_parser: Optional[PDFParser] = None
+
+def _init_worker(cache_dir: Optional[str] = None) -> None:
+    """Set up a parse_pdfs worker process"""
+    global _worker_parser
+    _worker_parser = PDFParser(cache_dir=cache_dir)
+
+def _parse_one(pdf_data: Union[bytes, str, os.PathLike]) -> Dict[str, Any]:
+    """Parse one PDF in a worker process; module level so ProcessPoolExecutor can pickle it"""
+    return _worker_parser.parse_pdf(pdf_data)
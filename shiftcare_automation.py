@@ -1,20 +1,342 @@
 import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import json
 import logging
-from typing import Dict, Any, Optional
-from playwright.async_api import async_playwright, Browser, Page
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+import aiohttp
+from cachetools import LRUCache
+from playwright.async_api import async_playwright, Browser, Locator, Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
 logger = logging.getLogger(__name__)
 
+# Logged-in contexts kept warm for session(), per event loop
+MAX_POOLED_CONTEXTS = 4
+# Pooled contexts are retired after this many jobs or this long unused, whichever comes first
+SESSION_MAX_USES = 50
+SESSION_IDLE_SECONDS = 300
+
+# Subresources the automation never looks at. Stylesheets still load because visibility checks depend on them.
+# ping covers sendBeacon/<a ping> posts; texttrack and cspviolationreport are captions and CSP reports
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'texttrack', 'ping', 'cspviolationreport'})
+_TRACKER_URL_PATTERN = re.compile(r'google-analytics|googletagmanager|segment\.(?:io|com)|hotjar|intercom|fullstory')
+
+# Elements that show a page has rendered after each action, waited on instead of networkidle,
+# which never settles while Shiftcare's analytics beacons keep the connection busy. The care plan
+# steps wait on the role locators of the control they use next instead
+_READY_TIMEOUT_MS = 5000
+# Page defaults instead of Playwright's 30 s, so a selector lost to a UI change fails in seconds
+_ACTION_TIMEOUT_MS = 5000
+_NAVIGATION_TIMEOUT_MS = 10000
+_AUTH_PROBE_TIMEOUT_MS = 2000
+# Fields are filled once their form is known to be up, so skip the per-field actionability checks
+_FILL_OPTIONS = {'timeout': 2000, 'force': True, 'no_wait_after': True}
+# Upper bound on the create POST itself, which is where Shiftcare does the work
+_SUBMIT_TIMEOUT_MS = 15000
+_LOGIN_FORM_ANCHOR = 'input[name="user[email]"]'
+_DASHBOARD_ANCHOR = 'nav[data-dashboard], a[href*="clients"]'
+_NEW_PERSON_ANCHOR = 'input[placeholder*="First Name"]'
+# Either outcome of a create submit: the success banner/record or the form's error messages
+_SUBMITTED_ANCHOR = '.alert-success, tr[data-client-id], .alert-danger, .error'
+_ITEM_FORM_ANCHOR = 'textarea, input[type="text"]'
+
+# Rails form helpers for the direct HTTP create path
+_TOKEN_INPUT_PATTERN = re.compile(r'<input[^>]*name="authenticity_token"[^>]*>')
+_CSRF_META_PATTERN = re.compile(r'<meta[^>]*name="csrf-token"[^>]*content="([^"]*)"')
+_VALUE_ATTR_PATTERN = re.compile(r'value="([^"]*)"')
+
+# (section, key, Rails parameter) for the new-client and new-staff forms
+_CLIENT_HTTP_FIELDS = (
+    ('personal_info', 'ssn', 'client[ssn]'),
+    ('personal_info', 'preferred_name', 'client[preferred_name]'),
+    ('personal_info', 'gender', 'client[gender]'),
+    ('personal_info', 'date_of_birth', 'client[date_of_birth]'),
+    ('contact_info', 'address', 'client[contact_attributes][address]'),
+    ('contact_info', 'unit_apartment', 'client[contact_attributes][unit]'),
+    ('contact_info', 'postal_code', 'client[contact_attributes][postal_code]'),
+    ('contact_info', 'phone', 'client[contact_attributes][mobile]'),
+    ('contact_info', 'secondary_phone', 'client[contact_attributes][phone]'),
+    ('contact_info', 'email', 'client[contact_attributes][email]'),
+    ('contact_info', 'secondary_email', 'client[contact_attributes][secondary_email]'),
+    ('contact_info', 'preferred_contact_method', 'client[preferred_contact_method]'),
+    ('personal_info', 'place_of_birth', 'client[place_of_birth]'),
+    ('personal_info', 'languages', 'client[languages]'),
+    ('personal_info', 'religion', 'client[religion]'),
+    ('personal_info', 'marital_status', 'client[marital_status]'),
+    ('personal_info', 'nationality', 'client[nationality]'),
+    ('personal_info', 'ethnicity', 'client[ethnicity]'),
+    ('personal_info', 'sexuality', 'client[sexuality]'),
+    ('personal_info', 'team', 'client[team_ids][]'),
+)
+_EMPLOYEE_HTTP_FIELDS = (
+    ('contact_info', 'email', 'user[email]'),
+    ('contact_info', 'phone', 'user[mobile]'),
+    ('personal_info', 'gender', 'user[gender]'),
+    ('personal_info', 'date_of_birth', 'user[date_of_birth]'),
+    ('contact_info', 'address', 'user[address]'),
+)
+
+# (section, key, selector, kind) for the browser forms, in fill order. The 'name' section is
+# _name_fields' output and a None section is a fixed click. 'uncheck' fields may be absent on some tenants
+_NAME_FORM_FIELDS = (
+    ('name', 'salutation', 'select[name*="salutation"]', 'select'),
+    ('name', 'first_name', 'input[placeholder*="First Name"]', 'fill'),
+    ('name', 'last_name', 'input[placeholder*="Last/Family Name"]', 'fill'),
+    ('name', 'middle_name', 'input[placeholder*="Middle Name"]', 'fill'),
+    ('name', 'display_name', 'input[placeholder*="Display Name"]', 'fill'),
+)
+_CLIENT_FORM_FIELDS = (
+    ('personal_info', 'ssn', ('input[placeholder*="Social Security Number"]', 'input[placeholder*="SSN"]'), 'fill'),
+) + _NAME_FORM_FIELDS + (
+    ('personal_info', 'preferred_name', 'input[placeholder*="Preferred Name"]', 'fill'),
+    ('personal_info', 'gender', 'select[placeholder*="Gender"]', 'select'),
+    ('personal_info', 'date_of_birth', 'input[placeholder*="Date Of Birth"]', 'fill'),
+    ('contact_info', 'address', 'input[placeholder*="Enter Address"]', 'fill'),
+    ('contact_info', 'unit_apartment', 'input[placeholder*="Unit/Apartment No"]', 'fill'),
+    ('contact_info', 'postal_code', 'input[placeholder*="Postal Code"]', 'fill'),
+    ('contact_info', 'phone', 'input[placeholder*="Mobile Number"]', 'fill'),
+    ('contact_info', 'secondary_phone', 'input[placeholder*="Phone Number"]', 'fill'),
+    ('contact_info', 'email', 'input[placeholder*="Email"]', 'fill'),
+    ('contact_info', 'secondary_email', 'input[placeholder*="Secondary Email"]', 'fill'),
+    ('contact_info', 'preferred_contact_method', 'select[placeholder*="Preferred Contact Method"]', 'select'),
+    ('personal_info', 'place_of_birth', 'input[placeholder*="Place of Birth"]', 'fill'),
+    ('personal_info', 'languages', 'input[placeholder*="Languages"]', 'fill'),
+    ('personal_info', 'religion', 'select[placeholder*="Religion"]', 'select'),
+    ('personal_info', 'marital_status', 'select[placeholder*="Marital Status"]', 'select'),
+    ('personal_info', 'nationality', 'select[placeholder*="Nationality"]', 'select'),
+    ('personal_info', 'ethnicity', 'select[placeholder*="Ethnicity"]', 'select'),
+    ('personal_info', 'sexuality', 'select[placeholder*="Sexuality"]', 'select'),
+    ('personal_info', 'team', 'select[placeholder*="Teams"]', 'select'),
+    # Client status - "Client is a prospect" is off by default
+    (None, None, 'input[name*="prospect"]', 'uncheck'),
+)
+_EMPLOYEE_FORM_FIELDS = _NAME_FORM_FIELDS + (
+    ('contact_info', 'email', 'input[placeholder*="Email"]', 'fill'),
+    # Contact number goes in mobile if the form has it, otherwise phone
+    ('contact_info', 'phone', ('input[placeholder*="Mobile Number"]', 'input[placeholder*="Phone Number"]'), 'fill'),
+    # Caregiver role is always selected
+    (None, None, 'input[value="Caregiver"]', 'check'),
+    ('personal_info', 'gender', 'select[placeholder*="Gender"]', 'select'),
+    ('personal_info', 'date_of_birth', 'input[placeholder*="Date Of Birth"]', 'fill'),
+    ('employment_info', 'employment_type', 'select[name*="employment_type"]', 'select'),
+    ('contact_info', 'address', 'input[placeholder*="Address"]', 'fill'),
+    # No onboarding emails from automated creates
+    (None, None, 'input[name*="onboarding_email"]', 'uncheck'),
+)
+_FORM_DEFAULTS = {'employment_info': {'employment_type': 'Casual'}}
+
+# Fills a whole form in one round trip. Values go through the native setter so React-controlled inputs see them.
+# Each field's winning selector is returned with the page version so later fills of the same version go
+# straight to it; a cached selector that stops matching falls back to the field's candidates
+_FILL_FORM_SCRIPT = """
+([fields, cached]) => {
+    let version = document.querySelector('meta[name="app-version"]')?.content;
+    if (!version) {
+        // No version tag, so fingerprint the form by its fields' placeholders, names and ids
+        let hash = 0;
+        for (const e of document.querySelectorAll('input, select, textarea')) {
+            for (const ch of `${e.placeholder || ''}|${e.name}|${e.id};`) hash = (hash * 31 + ch.charCodeAt(0)) | 0;
+        }
+        version = String(hash);
+    }
+    const known = cached && cached.version === version ? cached.selectors : {};
+    const selectors = {};
+    const missing = [];
+    for (const [selector, value, kind] of fields) {
+        const key = [].concat(selector).join(', ');
+        let sel = known[key];
+        let el = sel ? document.querySelector(sel) : null;
+        for (const candidate of el ? [] : [].concat(selector)) {
+            el = document.querySelector(candidate);
+            if (el) {
+                sel = candidate;
+                break;
+            }
+        }
+        if (!el) {
+            if (kind !== 'uncheck') missing.push(selector);
+            continue;
+        }
+        selectors[key] = sel;
+        // click() rather than setting checked, so the page's own handlers run
+        if (kind === 'check' || kind === 'uncheck') {
+            if (el.checked !== (kind === 'check')) el.click();
+            continue;
+        }
+        if (kind === 'select') {
+            const option = Array.from(el.options).find((o) => o.value === value || o.label.trim() === value);
+            if (!option) {
+                missing.push(selector);
+                continue;
+            }
+            el.value = option.value;
+        } else {
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        el.dispatchEvent(new Event('blur'));
+    }
+    return {missing, version, selectors};
+}
+"""
+
+# First error message on the page in one round trip. The class selectors usually hit, so the
+# [class*="error"]-style scan over every element only runs when they do not
+_ERROR_TEXT_SCRIPT = """
+() => {
+    const el = document.querySelector('.error, .alert-danger')
+        || Array.from(document.querySelectorAll('[class]')).find((e) => typeof e.className === 'string' && e.className.includes('error'));
+    return el ? el.textContent.trim() : null;
+}
+"""
+
+def _authenticity_token(html: str) -> Optional[str]:
+    """CSRF token of a Rails page, from its hidden form input or its csrf-token meta tag"""
+    tag = _TOKEN_INPUT_PATTERN.search(html)
+    value = _VALUE_ATTR_PATTERN.search(tag.group(0)) if tag else None
+    if value:
+        return value.group(1)
+    meta = _CSRF_META_PATTERN.search(html)
+    return meta.group(1) if meta else None
+
+def _form_fields(data: Dict[str, Any], specs: Tuple) -> List[Tuple[Any, str, str]]:
+    """(selector, value, kind) fills for the values present in data, ready for _fill_form"""
+    sections = {section: {**_FORM_DEFAULTS.get(section, {}), **(data.get(section) or {})}
+                for section in ('personal_info', 'contact_info', 'employment_info')}
+    sections['name'] = _name_fields(sections['personal_info'])
+    fields = []
+    for section, key, selector, kind in specs:
+        if section is None:
+            fields.append((selector, '', kind))
+        elif sections[section].get(key):
+            fields.append((selector, sections[section][key], kind))
+    return fields
+
+def _record_id(url: str, collection_path: str) -> Optional[str]:
+    """ID in a record URL such as /clients/123, which is where Shiftcare redirects after a create"""
+    match = re.search(re.escape(collection_path) + r'/(\d+)', url)
+    return match.group(1) if match else None
+
+def _care_plan_item_text(item: Any) -> str:
+    """Text of a goal or task: the parser gives {"description": ...} mappings (frozen proxies in the fixtures),
+    hand-built data may use plain strings"""
+    return item.get('description', '') if isinstance(item, Mapping) else item
+
+@functools.lru_cache(maxsize=256)
+def _name_parts(full_name: str) -> Tuple[str, ...]:
+    """Words of a full name, split once per name however many steps need them"""
+    return tuple(full_name.split())
+
+def _name_fields(personal_info: Dict[str, Any]) -> Dict[str, str]:
+    """Salutation, name parts and display name as the browser path fills them"""
+    fields = {}
+    full_name = personal_info.get('full_name')
+    name_parts = _name_parts(full_name) if full_name else ()
+    if full_name:
+        fields['salutation'] = personal_info.get('salutation', 'Mr')
+        if len(name_parts) >= 1:
+            fields['first_name'] = name_parts[0]
+        if len(name_parts) >= 2:
+            fields['last_name'] = name_parts[-1]
+        if len(name_parts) >= 3:
+            fields['middle_name'] = ' '.join(name_parts[1:-1])
+    display_name = personal_info.get('display_name', name_parts[0] if name_parts else '')
+    if display_name:
+        fields['display_name'] = display_name
+    return fields
+
+class _PlaywrightSingleton:
+    """One Playwright driver and Chromium browser per event loop, shared by every ShiftcareAutomation"""
+    _instances: Dict[asyncio.AbstractEventLoop, tuple] = {}
+    _locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+    
+    @classmethod
+    async def get(cls) -> tuple:
+        """Return (playwright, browser) for the running loop, launching or relaunching Chromium as needed"""
+        loop = asyncio.get_running_loop()
+        async with cls._locks.setdefault(loop, asyncio.Lock()):
+            playwright, browser = cls._instances.get(loop, (None, None))
+            if browser is None or not browser.is_connected():
+                if playwright is None:
+                    playwright = await async_playwright().start()
+                browser = await playwright.chromium.launch(headless=True)
+                cls._instances[loop] = (playwright, browser)
+            return playwright, browser
+    
+    @classmethod
+    async def stop(cls) -> None:
+        """Close the browser and driver started on the running loop"""
+        playwright, browser = cls._instances.pop(asyncio.get_running_loop(), (None, None))
+        if browser:
+            await browser.close()
+        if playwright:
+            await playwright.stop()
+
+async def close_shared_browser() -> None:
+    """Shut down the browser shared by all automations on this event loop"""
+    await _PlaywrightSingleton.stop()
+
+# Event loop the synchronous wrappers run on; started on first use and kept for the process
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+# How long a single-record sync call may take before the caller gets an error back
+SYNC_CALL_TIMEOUT = 120
+
+def _run_sync(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the long-lived background loop and wait for its result"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="shiftcare-sync", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coro, _sync_loop)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        # Cancel the job too, so it releases its session instead of running on unseen
+        future.cancel()
+        raise
+
 class ShiftcareAutomation:
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, http_create: bool = False,
+                 storage_state_path: Optional[str] = None, max_contexts: int = MAX_POOLED_CONTEXTS):
         self.username = username
         self.password = password
         self.base_url = "https://us.shiftcare.com"
+        # Cookies from the last login, reused by new contexts and optionally kept on disk across restarts
+        self.storage_state_path = storage_state_path
+        self._storage_state: Optional[Dict[str, Any]] = None
+        # Pooled sessions hand login state back to the automation that created them
+        self._owner = self
+        self.max_contexts = max_contexts
+        self._context_pools: Dict[asyncio.AbstractEventLoop, asyncio.Queue] = {}
+        self._pool_sweepers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+        # Selector each form field resolved to, per form path and page version; shared with pooled sessions
+        self._form_selectors = LRUCache(maxsize=32)
+        self._form_selectors_lock = threading.Lock()
+        # Bookkeeping for when this automation is itself a pooled session
+        self._uses = 0
+        self._last_used = time.monotonic()
+        # Create records with plain form POSTs, keeping the browser for fallback and care plans
+        self.http_create = http_create
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._http_logged_in = False
+        self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
     
     async def __aenter__(self):
-        """Async context manager entry"""
+        """Async context manager entry; starts the browser, so callers need no start_browser() of their own"""
         await self.start_browser()
         return self
     
@@ -23,41 +345,171 @@ class ShiftcareAutomation:
         await self.close_browser()
     
     async def start_browser(self):
-        """Start browser and navigate to login page"""
+        """Open a fresh context on the shared browser, on the dashboard if the saved login holds, else the login page"""
         try:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=True)
-            self.page = await self.browser.new_page()
-            
-            # Navigate to login page
-            await self.page.goto(f"{self.base_url}/users/sign_in")
-            await self.page.wait_for_load_state('networkidle')
+            if self.context:
+                await self.context.close()
+            # Launching Chromium is the slow part, so the browser is shared and only the context is per automation
+            self.playwright, self.browser = await _PlaywrightSingleton.get()
+            storage_state = self._owner._load_storage_state()
+            self.context = await self.browser.new_context(storage_state=storage_state)
+            await self.context.route("**/*", self._route_filter)
+            self.page = await self.context.new_page()
+            self.page.set_default_timeout(_ACTION_TIMEOUT_MS)
+            self.page.set_default_navigation_timeout(_NAVIGATION_TIMEOUT_MS)
+            
+            if storage_state:
+                # Saved cookies skip the login form until Shiftcare expires them; each job navigates itself
+                if await self._session_is_live():
+                    return
+                logger.info("Saved Shiftcare login has expired; logging in again")
+                self._owner._storage_state = None
+            
+            await self._open_login_page()
             
         except Exception as e:
             logger.error(f"Failed to start browser: {e}")
             raise
     
+    @staticmethod
+    async def _route_filter(route) -> None:
+        """Abort images, fonts, media, beacons and analytics requests; let everything else through"""
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _TRACKER_URL_PATTERN.search(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+    
     async def close_browser(self):
-        """Close browser"""
-        if self.browser:
-            await self.browser.close()
+        """Close this automation's browser context and pooled sessions, leaving the shared browser running"""
+        loop = asyncio.get_running_loop()
+        sweeper = self._pool_sweepers.pop(loop, None)
+        if sweeper:
+            sweeper.cancel()
+        pool = self._context_pools.pop(loop, None)
+        while pool and not pool.empty():
+            await pool.get_nowait().close_browser()
+        if self.context and self.browser.is_connected():
+            await self.context.close()
+        if self._http_session:
+            await self._http_session.close()
+            self._http_session = None
+            self._http_logged_in = False
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+    
+    def _load_storage_state(self) -> Optional[Dict[str, Any]]:
+        """Login state from memory, or persisted for this user by an earlier run"""
+        if self._storage_state is None and self.storage_state_path:
+            try:
+                with open(self.storage_state_path) as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if cached.get('username') == self.username:
+                self._storage_state = cached.get('storage_state')
+        return self._storage_state
+    
+    async def _store_storage_state(self, storage_state: Dict[str, Any]) -> None:
+        """Keep a fresh login state for new contexts and persist it when a path is set"""
+        self._storage_state = storage_state
+        if not self.storage_state_path:
+            return
+        payload = {'username': self.username, 'storage_state': storage_state}
+        tmp_path = f"{self.storage_state_path}.tmp"
+        try:
+            # Session cookies are credentials, so the file is private to this user
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.storage_state_path)
+        except OSError as e:
+            logger.warning(f"Could not persist Shiftcare login state: {e}")
+    
+    def _context_pool(self) -> asyncio.Queue:
+        """Warm sessions for the running loop, whose shared browser they belong to"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._context_pools:
+            # Last in, first out, so busy periods reuse the warmest sessions and the rest age out
+            self._context_pools[loop] = asyncio.LifoQueue(maxsize=self.max_contexts)
+            self._pool_sweepers[loop] = loop.create_task(self._sweep_pool(self._context_pools[loop]))
+        return self._context_pools[loop]
+    
+    @staticmethod
+    async def _sweep_pool(pool: asyncio.Queue) -> None:
+        """Close pooled sessions that have sat unused for SESSION_IDLE_SECONDS"""
+        while True:
+            await asyncio.sleep(SESSION_IDLE_SECONDS / 2)
+            sessions = []
+            while not pool.empty():
+                sessions.append(pool.get_nowait())
+            cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+            idle = [session for session in sessions if session._last_used < cutoff]
+            # Put the rest back oldest first so the most recently used stays on top
+            for session in reversed(sessions):
+                if session._last_used >= cutoff:
+                    pool.put_nowait(session)
+            for session in idle:
+                await session.close_browser()
+    
+    def _new_session(self) -> 'ShiftcareAutomation':
+        """An automation with its own context that shares this one's credentials and login state"""
+        session = ShiftcareAutomation(self.username, self.password, http_create=self.http_create)
+        session.base_url = self.base_url
+        session._owner = self._owner
+        return session
+    
+    async def warm_pool(self, count: Optional[int] = None) -> None:
+        """Fill the pool with logged-in sessions so the first jobs do not pay for a login"""
+        pool = self._context_pool()
+        sessions = [self._new_session() for _ in range(min(count or self.max_contexts, pool.maxsize - pool.qsize()))]
+        if sessions:
+            # The first login saves the state the others start from
+            await sessions[0].ensure_logged_in()
+            await asyncio.gather(*(session.ensure_logged_in() for session in sessions[1:]))
+        for session in sessions:
+            pool.put_nowait(session)
+    
+    @contextlib.asynccontextmanager
+    async def session(self):
+        """Check out a pooled, logged-in session; it goes back to the pool afterwards, reset only by its next goto.
+        Create methods re-check the login themselves, so a failed login surfaces as their error result"""
+        pool = self._context_pool()
+        try:
+            session = pool.get_nowait()
+        except asyncio.QueueEmpty:
+            session = self._new_session()
+        try:
+            await session.ensure_logged_in()
+            yield session
+        finally:
+            session._uses += 1
+            session._last_used = time.monotonic()
+            healthy = session.page is not None and not session.page.is_closed()
+            if healthy and session._uses < SESSION_MAX_USES and not pool.full():
+                pool.put_nowait(session)
+            else:
+                await session.close_browser()
     
     async def login(self) -> bool:
         """Login to Shiftcare"""
         try:
             # Fill in login form
-            await self.page.fill('input[name="user[email]"]', self.username)
-            await self.page.fill('input[name="user[password]"]', self.password)
+            await self.page.fill('input[name="user[email]"]', self.username, **_FILL_OPTIONS)
+            await self.page.fill('input[name="user[password]"]', self.password, **_FILL_OPTIONS)
             
             # Click sign in button
             await self.page.click('input[type="submit"]')
             
             # Wait for redirect after login
-            await self.page.wait_for_load_state('networkidle')
+            await self._wait_ready(_DASHBOARD_ANCHOR)
             
             # Check if login was successful
             if "dashboard" in self.page.url or "clients" in self.page.url:
                 logger.info("Successfully logged in to Shiftcare")
+                await self._owner._store_storage_state(await self.context.storage_state())
                 return True
             else:
                 logger.error("Login failed - not redirected to dashboard")
@@ -76,136 +528,31 @@ class ShiftcareAutomation:
             
             # Navigate to new client page
             await self.page.goto(f"{self.base_url}/clients/new")
-            await self.page.wait_for_load_state('networkidle')
+            await self._wait_ready(_NEW_PERSON_ANCHOR)
             
             # Fill in client information
-            personal_info = client_data.get('personal_info', {})
-            contact_info = client_data.get('contact_info', {})
-            emergency_contact = client_data.get('emergency_contact', {})
-            medical_info = client_data.get('medical_info', {})
-            
-            # Social Security Number
-            if personal_info.get('ssn'):
-                await self.page.fill('input[placeholder*="Social Security Number"]', personal_info['ssn'])
-            
-            # Name fields - handle salutation and name parts
-            if personal_info.get('full_name'):
-                name_parts = personal_info['full_name'].strip().split()
-                
-                # Set salutation (default to Mr if not specified)
-                salutation = personal_info.get('salutation', 'Mr')
-                await self.page.select_option('select[name*="salutation"]', salutation)
-                
-                # Fill name fields
-                if len(name_parts) >= 1:
-                    await self.page.fill('input[placeholder*="First Name"]', name_parts[0])
-                if len(name_parts) >= 2:
-                    await self.page.fill('input[placeholder*="Last/Family Name"]', name_parts[-1])
-                if len(name_parts) >= 3:
-                    await self.page.fill('input[placeholder*="Middle Name"]', ' '.join(name_parts[1:-1]))
-            
-            # Display Name (use first name if not specified)
-            display_name = personal_info.get('display_name', personal_info.get('full_name', '').split()[0] if personal_info.get('full_name') else '')
-            if display_name:
-                await self.page.fill('input[placeholder*="Display Name"]', display_name)
-            
-            # Preferred Name
-            if personal_info.get('preferred_name'):
-                await self.page.fill('input[placeholder*="Preferred Name"]', personal_info['preferred_name'])
-            
-            # Gender
-            gender = personal_info.get('gender', '')
-            if gender:
-                await self.page.select_option('select[placeholder*="Gender"]', gender)
-            
-            # Date of Birth
-            if personal_info.get('date_of_birth'):
-                dob = personal_info['date_of_birth']
-                await self.page.fill('input[placeholder*="Date Of Birth"]', dob)
-            
-            # Primary Address
-            if contact_info.get('address'):
-                await self.page.fill('input[placeholder*="Enter Address"]', contact_info['address'])
-            
-            # Unit/Apartment Number
-            if contact_info.get('unit_apartment'):
-                await self.page.fill('input[placeholder*="Unit/Apartment No"]', contact_info['unit_apartment'])
-            
-            # Postal Code
-            if contact_info.get('postal_code'):
-                await self.page.fill('input[placeholder*="Postal Code"]', contact_info['postal_code'])
-            
-            # Mobile Number
-            if contact_info.get('phone'):
-                await self.page.fill('input[placeholder*="Mobile Number"]', contact_info['phone'])
-            
-            # Phone Number (secondary)
-            if contact_info.get('secondary_phone'):
-                await self.page.fill('input[placeholder*="Phone Number"]', contact_info['secondary_phone'])
-            
-            # Email
-            if contact_info.get('email'):
-                await self.page.fill('input[placeholder*="Email"]', contact_info['email'])
-            
-            # Secondary Email
-            if contact_info.get('secondary_email'):
-                await self.page.fill('input[placeholder*="Secondary Email"]', contact_info['secondary_email'])
-            
-            # Preferred Contact Method
-            if contact_info.get('preferred_contact_method'):
-                await self.page.select_option('select[placeholder*="Preferred Contact Method"]', contact_info['preferred_contact_method'])
-            
-            # Place of Birth
-            if personal_info.get('place_of_birth'):
-                await self.page.fill('input[placeholder*="Place of Birth"]', personal_info['place_of_birth'])
-            
-            # Languages
-            if personal_info.get('languages'):
-                await self.page.fill('input[placeholder*="Languages"]', personal_info['languages'])
-            
-            # Religion
-            if personal_info.get('religion'):
-                await self.page.select_option('select[placeholder*="Religion"]', personal_info['religion'])
-            
-            # Marital Status
-            if personal_info.get('marital_status'):
-                await self.page.select_option('select[placeholder*="Marital Status"]', personal_info['marital_status'])
-            
-            # Nationality
-            if personal_info.get('nationality'):
-                await self.page.select_option('select[placeholder*="Nationality"]', personal_info['nationality'])
-            
-            # Ethnicity
-            if personal_info.get('ethnicity'):
-                await self.page.select_option('select[placeholder*="Ethnicity"]', personal_info['ethnicity'])
-            
-            # Sexuality
-            if personal_info.get('sexuality'):
-                await self.page.select_option('select[placeholder*="Sexuality"]', personal_info['sexuality'])
-            
-            # Teams
-            if personal_info.get('team'):
-                await self.page.select_option('select[placeholder*="Teams"]', personal_info['team'])
-            
-            # Client status - uncheck "Client is a prospect" by default
-            prospect_checkbox = self.page.locator('input[name*="prospect"]')
-            if await prospect_checkbox.is_checked():
-                await prospect_checkbox.uncheck()
+            fields = _form_fields(client_data, _CLIENT_FORM_FIELDS)
+            await self._fill_form(fields)
             
             # Submit the form
-            await self.page.click('button:has-text("Create")')
-            await self.page.wait_for_load_state('networkidle')
+            created, record_url = await self._submit_form('/clients')
+            if created is None:
+                # No POST response was seen, so judge by where the page ended up
+                record_url = self.page.url
+                created = "/clients/new" not in record_url
             
             # Check if client was created successfully
-            current_url = self.page.url
-            if "/clients/new" not in current_url:
+            if created:
                 logger.info("Client created successfully")
-                return {"success": True, "message": "Client created successfully"}
+                result = {"success": True, "message": "Client created successfully"}
+                client_id = _record_id(record_url, '/clients')
+                if client_id:
+                    result["client_id"] = client_id
+                return result
             else:
                 # Check for error messages
-                error_elements = await self.page.query_selector_all('.error, .alert-danger, [class*="error"]')
-                if error_elements:
-                    error_text = await error_elements[0].text_content()
+                error_text = await self.page.evaluate(_ERROR_TEXT_SCRIPT)
+                if error_text is not None:
                     logger.error(f"Failed to create client: {error_text}")
                     return {"error": f"Failed to create client: {error_text}"}
                 else:
@@ -220,16 +567,16 @@ class ShiftcareAutomation:
         """Create a new client and then add a care plan"""
         try:
             # First create the client
-            client_result = await self.create_client(client_data)
+            if self.http_create:
+                client_result = await self.create_client_http(client_data)
+            else:
+                client_result = await self.create_client(client_data)
             
             if not client_result.get('success'):
                 return client_result
             
-            # Wait a moment for the client to be created
-            await asyncio.sleep(2)
-            
-            # Now navigate to client list and find the newly created client
-            care_plan_result = await self.add_care_plan_to_client(client_data)
+            # Open the new client's care plan form, by its ID or by finding it in the client list
+            care_plan_result = await self.add_care_plan_to_client(client_data, client_result.get('client_id'))
             
             if care_plan_result.get('success'):
                 return {
@@ -250,64 +597,18 @@ class ShiftcareAutomation:
             logger.error(f"Error in create_client_with_care_plan: {e}")
             return {"error": str(e)}
     
-    async def add_care_plan_to_client(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Navigate to client list, find the client, and add a care plan"""
+    async def add_care_plan_to_client(self, client_data: Dict[str, Any], client_id: Optional[str] = None) -> Dict[str, Any]:
+        """Open the client's new care plan form, directly by ID when known, and add a care plan"""
         try:
-            # Navigate to clients list
-            await self.page.goto(f"{self.base_url}/clients")
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Get the client name to search for
-            client_name = client_data.get('personal_info', {}).get('full_name', '')
-            if not client_name:
-                return {"error": "No client name provided"}
-            
-            # Extract first and last name for searching
-            name_parts = client_name.strip().split()
-            if len(name_parts) < 2:
-                return {"error": "Client name must have at least first and last name"}
-            
-            first_name = name_parts[0]
-            last_name = name_parts[-1]
-            
-            # Search for the client in the table
-            # Look for the client name in the table
-            client_row = None
-            try:
-                # Try to find the client by name in the table
-                client_link = self.page.locator(f'tr:has-text("{first_name}")').first
-                if await client_link.is_visible():
-                    client_row = client_link
-                else:
-                    # Try alternative search methods
-                    client_link = self.page.locator(f'a:has-text("{first_name} {last_name}")').first
-                    if await client_link.is_visible():
-                        client_row = client_link
-            except:
-                pass
-            
-            if not client_row:
-                return {"error": f"Could not find client {first_name} {last_name} in the list"}
-            
-            # Click on the client to open their profile
-            await client_row.click()
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Navigate to Care Plan tab
-            care_plan_tab = self.page.locator('a:has-text("Care Plan")')
-            if await care_plan_tab.is_visible():
-                await care_plan_tab.click()
-                await self.page.wait_for_load_state('networkidle')
+            if client_id:
+                # The create redirect named the client, so skip the client list and its search
+                await self.page.goto(f"{self.base_url}/clients/{client_id}/care_plans/new")
+                if not await self._wait_ready(self._button("Confirm")):
+                    return {"error": f"Could not open the care plan form for client {client_id}"}
             else:
-                return {"error": "Could not find Care Plan tab"}
-            
-            # Click "Add Care Plan" button
-            add_care_plan_button = self.page.locator('button:has-text("Add Care Plan")')
-            if await add_care_plan_button.is_visible():
-                await add_care_plan_button.click()
-                await self.page.wait_for_load_state('networkidle')
-            else:
-                return {"error": "Could not find Add Care Plan button"}
+                error = await self._open_care_plan_from_list(client_data)
+                if error:
+                    return error
             
             # Fill in the care plan modal
             care_plan_info = client_data.get('care_plan', {})
@@ -316,27 +617,27 @@ class ShiftcareAutomation:
             care_plan_name = care_plan_info.get('name', 'Care Plan Assessment')
             name_field = self.page.locator('input[placeholder*="Care plan assessment"]')
             if await name_field.is_visible():
-                await name_field.fill(care_plan_name)
+                await name_field.fill(care_plan_name, **_FILL_OPTIONS)
             
             # Start date (default to today)
             start_date = care_plan_info.get('start_date', '')
             if start_date:
                 start_date_field = self.page.locator('input[name*="start_date"]')
                 if await start_date_field.is_visible():
-                    await start_date_field.fill(start_date)
+                    await start_date_field.fill(start_date, **_FILL_OPTIONS)
             
             # End date (default to 30 days from start)
             end_date = care_plan_info.get('end_date', '')
             if end_date:
                 end_date_field = self.page.locator('input[name*="end_date"]')
                 if await end_date_field.is_visible():
-                    await end_date_field.fill(end_date)
+                    await end_date_field.fill(end_date, **_FILL_OPTIONS)
             
             # Confirm the care plan creation
-            confirm_button = self.page.locator('button:has-text("Confirm")')
+            confirm_button = self._button("Confirm")
             if await confirm_button.is_visible():
                 await confirm_button.click()
-                await self.page.wait_for_load_state('networkidle')
+                await self._wait_ready(self._care_plan_items_anchor())
             else:
                 return {"error": "Could not find Confirm button"}
             
@@ -353,62 +654,85 @@ class ShiftcareAutomation:
             logger.error(f"Error adding care plan to client: {e}")
             return {"error": str(e)}
     
+    async def _open_care_plan_from_list(self, client_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Find the client in the client list and open its Add Care Plan modal; an error result on failure"""
+        # Get the client name to search for
+        client_name = client_data.get('personal_info', {}).get('full_name', '')
+        if not client_name:
+            return {"error": "No client name provided"}
+        
+        # Extract first and last name for searching
+        name_parts = _name_parts(client_name)
+        if len(name_parts) < 2:
+            return {"error": "Client name must have at least first and last name"}
+        
+        first_name = name_parts[0]
+        last_name = name_parts[-1]
+        
+        # Navigate to clients list and wait for the new client to be listed rather than sleeping
+        await self.page.goto(f"{self.base_url}/clients")
+        await self._wait_ready(f'tr:has-text("{first_name}"), a:has-text("{first_name} {last_name}")')
+        
+        # Search for the client in the table
+        # Look for the client name in the table
+        client_row = None
+        try:
+            # Try to find the client by name in the table
+            client_link = self.page.locator(f'tr:has-text("{first_name}")').first
+            if await client_link.is_visible():
+                client_row = client_link
+            else:
+                # Try alternative search methods
+                client_link = self.page.locator(f'a:has-text("{first_name} {last_name}")').first
+                if await client_link.is_visible():
+                    client_row = client_link
+        except:
+            pass
+        
+        if not client_row:
+            return {"error": f"Could not find client {first_name} {last_name} in the list"}
+        
+        # Click on the client to open their profile
+        await client_row.click()
+        care_plan_tab = self.page.get_by_role("link", name="Care Plan", exact=True)
+        await self._wait_ready(care_plan_tab)
+        
+        # Navigate to Care Plan tab
+        if await care_plan_tab.is_visible():
+            await care_plan_tab.click()
+        else:
+            return {"error": "Could not find Care Plan tab"}
+        
+        # Click "Add Care Plan" button
+        add_care_plan_button = self._button("Add Care Plan")
+        await self._wait_ready(add_care_plan_button)
+        if await add_care_plan_button.is_visible():
+            await add_care_plan_button.click()
+            await self._wait_ready(self._button("Confirm"))
+        else:
+            return {"error": "Could not find Add Care Plan button"}
+        return None
+    
     async def add_tasks_to_care_plan(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Add tasks and goals to the care plan"""
+        """Add goals and tasks to the care plan open on this page"""
         try:
-            # Extract tasks and goals from the client data
-            tasks = client_data.get('tasks', [])
-            goals = client_data.get('goals', [])
-            
-            # Look for "Add First Goal" or "Add First Task" buttons
-            add_goal_button = self.page.locator('button:has-text("Add First Goal")')
-            add_task_button = self.page.locator('button:has-text("Add First Task")')
+            # Extract tasks and goals from the client data, goals first
+            items = [('goal', goal) for goal in client_data.get('goals', [])]
+            items += [('task', task) for task in client_data.get('tasks', [])]
             
             results = {"goals_added": 0, "tasks_added": 0, "errors": []}
             
-            # Add goals first
-            if goals and await add_goal_button.is_visible():
-                for goal in goals:
-                    try:
-                        await add_goal_button.click()
-                        await self.page.wait_for_load_state('networkidle')
-                        
-                        # Fill in goal details
-                        goal_text_field = self.page.locator('textarea, input[type="text"]').first
-                        if await goal_text_field.is_visible():
-                            await goal_text_field.fill(goal.get('description', goal))
-                        
-                        # Save the goal
-                        save_button = self.page.locator('button:has-text("Save"), button:has-text("Add")').first
-                        if await save_button.is_visible():
-                            await save_button.click()
-                            await self.page.wait_for_load_state('networkidle')
-                            results["goals_added"] += 1
-                        
-                    except Exception as e:
-                        results["errors"].append(f"Error adding goal '{goal}': {str(e)}")
-            
-            # Add tasks
-            if tasks and await add_task_button.is_visible():
-                for task in tasks:
-                    try:
-                        await add_task_button.click()
-                        await self.page.wait_for_load_state('networkidle')
-                        
-                        # Fill in task details
-                        task_text_field = self.page.locator('textarea, input[type="text"]').first
-                        if await task_text_field.is_visible():
-                            await task_text_field.fill(task.get('description', task))
-                        
-                        # Save the task
-                        save_button = self.page.locator('button:has-text("Save"), button:has-text("Add")').first
-                        if await save_button.is_visible():
-                            await save_button.click()
-                            await self.page.wait_for_load_state('networkidle')
-                            results["tasks_added"] += 1
-                        
-                    except Exception as e:
-                        results["errors"].append(f"Error adding task '{task}': {str(e)}")
+            # Items are saved one after another on this page: a just-confirmed plan has no stable URL other
+            # sessions could open, and each save changes the add buttons the next item looks for
+            for kind, item in items:
+                try:
+                    error = await self._add_care_plan_item(kind, item)
+                except Exception as e:
+                    error = str(e)
+                if error is None:
+                    results[f"{kind}s_added"] += 1
+                else:
+                    results["errors"].append(f"Error adding {kind} '{_care_plan_item_text(item)}': {error}")
             
             return results
             
@@ -416,6 +740,27 @@ class ShiftcareAutomation:
             logger.error(f"Error adding tasks to care plan: {e}")
             return {"error": str(e)}
     
+    async def _add_care_plan_item(self, kind: str, item: Any) -> Optional[str]:
+        """Add one goal or task to the open care plan; None once it has been saved, else why it was not"""
+        add_button = self._add_item_button(kind)
+        if not await add_button.is_visible():
+            return f"could not find the Add {kind.title()} button"
+        await add_button.click()
+        await self._wait_ready(_ITEM_FORM_ANCHOR)
+        
+        # Fill in the details
+        text_field = self.page.locator('textarea, input[type="text"]').first
+        if await text_field.is_visible():
+            await text_field.fill(_care_plan_item_text(item), **_FILL_OPTIONS)
+        
+        # Save the item
+        save_button = self._button("Save").or_(self._button("Add")).first
+        if not await save_button.is_visible():
+            return "could not find the Save button"
+        await save_button.click()
+        await self._wait_ready(self._care_plan_items_anchor())
+        return None
+    
     async def create_employee(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new employee in Shiftcare"""
         try:
@@ -425,93 +770,27 @@ class ShiftcareAutomation:
             
             # Navigate to new staff page
             await self.page.goto(f"{self.base_url}/users/staff/new")
-            await self.page.wait_for_load_state('networkidle')
+            await self._wait_ready(_NEW_PERSON_ANCHOR)
             
             # Fill in employee information
-            personal_info = employee_data.get('personal_info', {})
-            contact_info = employee_data.get('contact_info', {})
-            employment_info = employee_data.get('employment_info', {})
-            
-            # Name fields - handle salutation and name parts
-            if personal_info.get('full_name'):
-                name_parts = personal_info['full_name'].strip().split()
-                
-                # Set salutation (default to Mr if not specified)
-                salutation = personal_info.get('salutation', 'Mr')
-                await self.page.select_option('select[name*="salutation"]', salutation)
-                
-                # Fill name fields
-                if len(name_parts) >= 1:
-                    await self.page.fill('input[placeholder*="First Name"]', name_parts[0])
-                if len(name_parts) >= 2:
-                    await self.page.fill('input[placeholder*="Last/Family Name"]', name_parts[-1])
-                if len(name_parts) >= 3:
-                    await self.page.fill('input[placeholder*="Middle Name"]', ' '.join(name_parts[1:-1]))
-            
-            # Display Name (use first name if not specified)
-            display_name = personal_info.get('display_name', personal_info.get('full_name', '').split()[0] if personal_info.get('full_name') else '')
-            if display_name:
-                await self.page.fill('input[placeholder*="Display Name"]', display_name)
-            
-            # Email
-            if contact_info.get('email'):
-                await self.page.fill('input[placeholder*="Email"]', contact_info['email'])
-            
-            # Contact numbers
-            if contact_info.get('phone'):
-                # Try mobile first, then phone
-                mobile_field = self.page.locator('input[placeholder*="Mobile Number"]')
-                phone_field = self.page.locator('input[placeholder*="Phone Number"]')
-                
-                if await mobile_field.is_visible():
-                    await mobile_field.fill(contact_info['phone'])
-                elif await phone_field.is_visible():
-                    await phone_field.fill(contact_info['phone'])
-            
-            # Select Caregiver role (default)
-            caregiver_radio = self.page.locator('input[value="Caregiver"]')
-            if await caregiver_radio.is_visible():
-                await caregiver_radio.check()
-            
-            # Gender
-            gender = personal_info.get('gender', '')
-            if gender:
-                await self.page.select_option('select[placeholder*="Gender"]', gender)
-            
-            # Date of Birth
-            if personal_info.get('date_of_birth'):
-                dob = personal_info['date_of_birth']
-                # Convert date format if needed (MM-DD-YYYY)
-                await self.page.fill('input[placeholder*="Date Of Birth"]', dob)
-            
-            # Employment Type (default to Casual)
-            employment_type = employment_info.get('employment_type', 'Casual')
-            await self.page.select_option('select[name*="employment_type"]', employment_type)
-            
-            # Address
-            if contact_info.get('address'):
-                await self.page.fill('input[placeholder*="Address"]', contact_info['address'])
-            
-            # Uncheck "Send Onboarding Email" to avoid sending emails during automation
-            onboarding_email_checkbox = self.page.locator('input[name*="onboarding_email"]')
-            if await onboarding_email_checkbox.is_checked():
-                await onboarding_email_checkbox.uncheck()
+            fields = _form_fields(employee_data, _EMPLOYEE_FORM_FIELDS)
+            await self._fill_form(fields)
             
             # Submit the form
-            await self.page.click('button:has-text("Create")')
-            await self.page.wait_for_load_state('networkidle')
+            created, record_url = await self._submit_form('/users/staff')
+            if created is None:
+                # No POST response was seen, so look for success indicators or a redirect away from the new page
+                current_url = self.page.url
+                created = "/staff/new" not in current_url or "success" in current_url.lower()
             
             # Check if employee was created successfully
-            # Look for success indicators or redirect away from new page
-            current_url = self.page.url
-            if "/staff/new" not in current_url or "success" in current_url.lower():
+            if created:
                 logger.info("Employee created successfully")
                 return {"success": True, "message": "Employee created successfully"}
             else:
                 # Check for error messages
-                error_elements = await self.page.query_selector_all('.error, .alert-danger, [class*="error"]')
-                if error_elements:
-                    error_text = await error_elements[0].text_content()
+                error_text = await self.page.evaluate(_ERROR_TEXT_SCRIPT)
+                if error_text is not None:
                     logger.error(f"Failed to create employee: {error_text}")
                     return {"error": f"Failed to create employee: {error_text}"}
                 else:
@@ -522,14 +801,195 @@ class ShiftcareAutomation:
             logger.error(f"Error creating employee: {e}")
             return {"error": str(e)}
     
+    async def _wait_ready(self, anchor: Union[str, Locator]) -> bool:
+        """Wait for the DOM and then for an element that only appears once the page is usable"""
+        await self.page.wait_for_load_state('domcontentloaded')
+        try:
+            if isinstance(anchor, str):
+                await self.page.wait_for_selector(anchor, state='visible', timeout=_READY_TIMEOUT_MS)
+            else:
+                await anchor.first.wait_for(state='visible', timeout=_READY_TIMEOUT_MS)
+            return True
+        except PlaywrightTimeoutError:
+            # Callers still check the URL or element they need, so a missing anchor is not fatal here
+            logger.warning(f"Timed out waiting for {anchor}")
+            return False
+    
+    def _button(self, name: str) -> Locator:
+        """Button by its exact accessible name, which avoids :has-text substring scans and near-miss labels"""
+        return self.page.get_by_role("button", name=name, exact=True)
+    
+    def _add_item_button(self, kind: str) -> Locator:
+        """Add button for a goal or task; it reads "Add First ..." only while that list is empty"""
+        return self._button(f"Add First {kind.title()}").or_(self._button(f"Add {kind.title()}")).first
+    
+    def _care_plan_items_anchor(self) -> Locator:
+        """The add goal/task buttons a saved care plan shows"""
+        return self._add_item_button('goal').or_(self._add_item_button('task'))
+    
+    async def _submit_form(self, create_path: str) -> Tuple[Optional[bool], Optional[str]]:
+        """Click Create and judge the create from its POST response: (True, record URL) on a redirect,
+        (False, None) when the form came back, (None, None) when no response was seen and the page must be checked"""
+        created = None
+        try:
+            async with self.page.expect_response(
+                lambda r: r.request.method == "POST" and urlparse(r.url).path == create_path,
+                timeout=_SUBMIT_TIMEOUT_MS,
+            ) as response_info:
+                await self.page.click('button:has-text("Create")')
+            response = await response_info.value
+            location = response.headers.get('location')
+            # Rails answers a successful create with a redirect to the record, so there is nothing to wait for
+            if 300 <= response.status < 400 and location:
+                return True, urljoin(response.url, location)
+            # Anything else (a re-rendered 200/422 form) failed, whatever URL the page ends up on
+            created = False
+            logger.warning(f"POST to {create_path} answered {response.status} without a redirect")
+        except PlaywrightTimeoutError:
+            logger.warning(f"No response to the POST to {create_path}; checking the page instead")
+        # Errors are rendered in place (or the app does not redirect), so wait for what the page shows
+        await self._wait_ready(_SUBMITTED_ANCHOR)
+        return created, None
+    
+    async def _fill_form(self, fields: List[Tuple[Any, str, str]]) -> List[Any]:
+        """Fill (selector, value, kind) fields in a single page.evaluate instead of one round trip each.
+        Returns the selectors that matched nothing or whose select had no such option"""
+        owner = self._owner
+        path = urlparse(self.page.url).path
+        with owner._form_selectors_lock:
+            cached = owner._form_selectors.get(path)
+        result = await self.page.evaluate(_FILL_FORM_SCRIPT, [[list(field) for field in fields], cached])
+        selectors = result['selectors']
+        if cached and cached['version'] == result['version']:
+            # Keep what other fills resolved on this version, minus anything that no longer matched
+            stale = {', '.join([selector] if isinstance(selector, str) else selector) for selector in result['missing']}
+            selectors = {key: sel for key, sel in cached['selectors'].items() if key not in stale}
+            selectors.update(result['selectors'])
+        with owner._form_selectors_lock:
+            owner._form_selectors[path] = {'version': result['version'], 'selectors': selectors}
+        if result['missing']:
+            logger.warning(f"Form fields not found or value not offered: {result['missing']}")
+        return result['missing']
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Cookie-keeping session for the direct HTTP path, created on first use"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+            self._http_logged_in = False
+        return self._http_session
+    
+    async def _http_login(self) -> bool:
+        """Sign in with a form POST so the session cookie can be reused for direct creates"""
+        session = self._get_http_session()
+        async with session.get(f"{self.base_url}/users/sign_in") as response:
+            token = _authenticity_token(await response.text())
+        form = {'user[email]': self.username, 'user[password]': self.password}
+        if token:
+            form['authenticity_token'] = token
+        async with session.post(f"{self.base_url}/users/sign_in", data=form) as response:
+            self._http_logged_in = response.status < 400 and "sign_in" not in str(response.url)
+        if not self._http_logged_in:
+            logger.error("HTTP login to Shiftcare failed")
+        return self._http_logged_in
+    
+    async def _http_create(self, new_path: str, create_path: str, fields: Dict[str, str]) -> Optional[str]:
+        """POST a Rails new-record form directly; the URL Shiftcare redirected to, or None if it did not"""
+        if not self._http_logged_in and not await self._http_login():
+            return None
+        session = self._get_http_session()
+        async with session.get(f"{self.base_url}{new_path}") as response:
+            html = await response.text()
+            if "sign_in" in str(response.url):
+                self._http_logged_in = False
+                return None
+        token = _authenticity_token(html)
+        # Rails silently drops unknown parameters, so only post when the form has every field we send
+        missing = [name for name in fields if f'name="{name}"' not in html]
+        if not token or missing:
+            logger.warning(f"Form at {new_path} does not match the direct create fields: {missing or 'no token'}")
+            return None
+        form = aiohttp.FormData({'authenticity_token': token, **fields})
+        async with session.post(f"{self.base_url}{create_path}", data=form) as response:
+            # A successful create redirects; a form with validation errors is rendered in place
+            if response.status < 400 and response.history and new_path not in str(response.url):
+                return str(response.url)
+            return None
+    
+    async def create_client_http(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a client with a direct form POST, falling back to the browser if it is not accepted"""
+        personal_info = client_data.get('personal_info', {})
+        fields = {f'client[{key}]': value for key, value in _name_fields(personal_info).items()}
+        for section, key, name in _CLIENT_HTTP_FIELDS:
+            if client_data.get(section, {}).get(key):
+                fields[name] = client_data[section][key]
+        fields['client[prospect]'] = '0'
+        return await self._create_via_http('/clients/new', '/clients', fields, "Client", self.create_client, client_data)
+    
+    async def create_employee_http(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an employee with a direct form POST, falling back to the browser if it is not accepted"""
+        personal_info = employee_data.get('personal_info', {})
+        fields = {f'user[{key}]': value for key, value in _name_fields(personal_info).items()}
+        for section, key, name in _EMPLOYEE_HTTP_FIELDS:
+            if employee_data.get(section, {}).get(key):
+                fields[name] = employee_data[section][key]
+        fields['user[role]'] = 'Caregiver'
+        fields['user[employment_type]'] = employee_data.get('employment_info', {}).get('employment_type', 'Casual')
+        fields['user[send_onboarding_email]'] = '0'
+        return await self._create_via_http('/users/staff/new', '/users/staff', fields, "Employee", self.create_employee, employee_data)
+    
+    async def _create_via_http(self, new_path: str, create_path: str, fields: Dict[str, str], kind: str, fallback, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Try the direct POST and hand over to the browser path when it does not go through"""
+        try:
+            url = await self._http_create(new_path, create_path, fields)
+            if url:
+                logger.info(f"{kind} created successfully via HTTP")
+                result = {"success": True, "message": f"{kind} created successfully"}
+                record_id = _record_id(url, create_path)
+                if record_id:
+                    result[f"{kind.lower()}_id"] = record_id
+                return result
+        except aiohttp.ClientError as e:
+            logger.warning(f"Direct {kind.lower()} create failed: {e}")
+        logger.info(f"Falling back to the browser to create {kind.lower()}")
+        if not await self.ensure_logged_in():
+            return {"error": "Failed to login"}
+        return await fallback(data)
+    
+    async def ensure_logged_in(self) -> bool:
+        """Start the browser if needed and log in, reusing the session across calls"""
+        if self.page is None or self.page.is_closed() or not self.browser.is_connected():
+            await self.close_browser()
+            await self.start_browser()
+        return await self._ensure_logged_in()
+    
+    async def _session_is_live(self) -> bool:
+        """Ask for the dashboard without following redirects; the context's cookies make it 200 only when logged in"""
+        try:
+            response = await self.context.request.get(f"{self.base_url}/dashboard", max_redirects=0, timeout=_AUTH_PROBE_TIMEOUT_MS)
+        except PlaywrightError as e:
+            # A slow or failed probe is treated as logged out; the login path has its own checks
+            logger.warning(f"Shiftcare session probe failed: {e}")
+            return False
+        try:
+            return response.status == 200
+        finally:
+            await response.dispose()
+    
+    async def _open_login_page(self) -> None:
+        """Navigate to the login page"""
+        await self.page.goto(f"{self.base_url}/users/sign_in")
+        await self._wait_ready(_LOGIN_FORM_ANCHOR)
+    
     async def _ensure_logged_in(self) -> bool:
         """Ensure we're logged in, login if not"""
         try:
-            # Check if we're already logged in
-            if "dashboard" in self.page.url or "clients" in self.page.url or "staff" in self.page.url:
+            # One HTTP round trip, no rendering, and unlike page.url it notices an expired session
+            if await self._session_is_live():
                 return True
             
             # Try to login
+            if "sign_in" not in self.page.url:
+                await self._open_login_page()
             return await self.login()
             
         except Exception as e:
@@ -539,27 +999,63 @@ class ShiftcareAutomation:
     # Synchronous wrapper methods for Flask
     def create_client_sync(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
         """Synchronous wrapper for create_client"""
-        return asyncio.run(self._create_client_async(client_data))
+        try:
+            return _run_sync(self._create_client_async(client_data), timeout=SYNC_CALL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"create_client timed out after {SYNC_CALL_TIMEOUT}s")
+            return {"error": f"Timed out after {SYNC_CALL_TIMEOUT}s"}
     
     def create_client_with_care_plan_sync(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
         """Synchronous wrapper for create_client_with_care_plan"""
-        return asyncio.run(self._create_client_with_care_plan_async(client_data))
+        try:
+            return _run_sync(self._create_client_with_care_plan_async(client_data), timeout=SYNC_CALL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"create_client_with_care_plan timed out after {SYNC_CALL_TIMEOUT}s")
+            return {"error": f"Timed out after {SYNC_CALL_TIMEOUT}s"}
     
     def create_employee_sync(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
         """Synchronous wrapper for create_employee"""
-        return asyncio.run(self._create_employee_async(employee_data))
+        try:
+            return _run_sync(self._create_employee_async(employee_data), timeout=SYNC_CALL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"create_employee timed out after {SYNC_CALL_TIMEOUT}s")
+            return {"error": f"Timed out after {SYNC_CALL_TIMEOUT}s"}
+    
+    def create_clients_bulk_sync(self, records: List[Dict[str, Any]], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Create many clients side by side over pooled sessions; results are in input order"""
+        return _run_sync(self._create_clients_bulk_async(records, concurrency))
+    
+    async def _create_clients_bulk_async(self, records: List[Dict[str, Any]], concurrency: int) -> List[Dict[str, Any]]:
+        """Run create_client per record, at most concurrency at a time, each in its own session"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def create(record: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    async with self.session() as session:
+                        if session.http_create:
+                            return await session.create_client_http(record)
+                        return await session.create_client(record)
+                except Exception as e:
+                    return {"error": str(e)}
+        
+        results = await asyncio.gather(*(create(record) for record in records))
+        for index, result in enumerate(results):
+            if not result.get('success'):
+                logger.error(f"Bulk client {index + 1}/{len(records)} failed: {result.get('error')}")
+        return results
     
     async def _create_client_async(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Async method for creating client"""
-        async with self:
-            return await self.create_client(client_data)
+        """Async method for creating client on a pooled session"""
+        async with self.session() as session:
+            return await session.create_client(client_data)
     
     async def _create_client_with_care_plan_async(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Async method for creating client with care plan"""
-        async with self:
-            return await self.create_client_with_care_plan(client_data)
+        """Async method for creating client with care plan on a pooled session"""
+        async with self.session() as session:
+            return await session.create_client_with_care_plan(client_data)
     
     async def _create_employee_async(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Async method for creating employee"""
-        async with self:
-            return await self.create_employee(employee_data)
+        """Async method for creating employee on a pooled session"""
+        async with self.session() as session:
+            return await session.create_employee(employee_data)
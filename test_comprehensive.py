@@ -4,15 +4,62 @@ Comprehensive test script for GoFormz-Shiftcare integration
 Tests both client and employee packet processing with realistic data
 """
 
-import os
 import asyncio
-from dotenv import load_dotenv
 from goformz_client import GoFormzClient
 from pdf_parser import PDFParser
 from shiftcare_automation import ShiftcareAutomation
+from fixtures import (
+    ENV, SAMPLE_CLIENT_TEXT, SAMPLE_EMPLOYEE_TEXT, SAMPLE_CLIENT_DATA, SAMPLE_EMPLOYEE_DATA, SHIFTCARE_STORAGE_STATE_PATH,
+    skip_shiftcare_tests
+)
 
-# Load environment variables
-load_dotenv()
+# Inputs shared by the client and employee forms
+FIRST_NAME_INPUT = 'input[placeholder*="First Name"]'
+LAST_NAME_INPUT = 'input[placeholder*="Last/Family Name"]'
+EMAIL_INPUT = 'input[placeholder*="Email"]'
+SSN_INPUT = 'input[placeholder*="Social Security Number"]'
+
+# (label, section, key) of each parsed field the parser tests report
+CLIENT_REPORT_FIELDS = (
+    ("Name", 'personal_info', 'full_name'),
+    ("Preferred Name", 'personal_info', 'preferred_name'),
+    ("Salutation", 'personal_info', 'salutation'),
+    ("Gender", 'personal_info', 'gender'),
+    ("SSN", 'personal_info', 'ssn'),
+    ("DOB", 'personal_info', 'date_of_birth'),
+    ("Place of Birth", 'personal_info', 'place_of_birth'),
+    ("Languages", 'personal_info', 'languages'),
+    ("Religion", 'personal_info', 'religion'),
+    ("Marital Status", 'personal_info', 'marital_status'),
+    ("Nationality", 'personal_info', 'nationality'),
+    ("Ethnicity", 'personal_info', 'ethnicity'),
+    ("Primary Phone", 'contact_info', 'phone'),
+    ("Secondary Phone", 'contact_info', 'secondary_phone'),
+    ("Primary Email", 'contact_info', 'email'),
+    ("Secondary Email", 'contact_info', 'secondary_email'),
+    ("Address", 'contact_info', 'address'),
+    ("Unit", 'contact_info', 'unit_apartment'),
+    ("Postal Code", 'contact_info', 'postal_code'),
+    ("Preferred Contact", 'contact_info', 'preferred_contact_method'),
+    ("Emergency Contact", 'emergency_contact', 'name'),
+    ("Emergency Phone", 'emergency_contact', 'phone'),
+    ("Medical Conditions", 'medical_info', 'conditions'),
+    ("Medications", 'medical_info', 'medications'),
+)
+EMPLOYEE_REPORT_FIELDS = (
+    ("Name", 'personal_info', 'full_name'),
+    ("Salutation", 'personal_info', 'salutation'),
+    ("Gender", 'personal_info', 'gender'),
+    ("DOB", 'personal_info', 'date_of_birth'),
+    ("Phone", 'contact_info', 'phone'),
+    ("Email", 'contact_info', 'email'),
+    ("Position", 'employment_info', 'position'),
+    ("Employment Type", 'employment_info', 'employment_type'),
+)
+
+def _format_report(parsed_data, fields):
+    """'  - label: value' lines for fields, joined so a report goes out in one write rather than a print each"""
+    return "\n".join(f"  - {label}: {parsed_data[section].get(key, 'N/A')}" for label, section, key in fields)
 
 def test_pdf_parser_with_client_data():
     """Test PDF parser with realistic client packet data"""
@@ -21,72 +68,15 @@ def test_pdf_parser_with_client_data():
     parser = PDFParser()
     
     # Sample client packet text
-    sample_client_text = """
-    Client Packet
-    
-    Name: Mr. John Smith
-    Preferred Name: Johnny
-    Date of Birth: 05/15/1975
-    Gender: Male
-    SSN: 123-45-6789
-    Place of Birth: Denver, Colorado
-    Languages: English, Spanish
-    
-    Primary Phone: (555) 123-4567
-    Secondary Phone: (555) 123-4568
-    Primary Email: john.smith@email.com
-    Secondary Email: johnny.smith@gmail.com
-    
-    Address: 123 Main Street
-    Unit: Apt 4B
-    Postal Code: 80202
-    
-    Preferred Contact Method: Phone
-    
-    Religion: Christian
-    Marital Status: Married
-    Nationality: American
-    Ethnicity: Caucasian
-    
-    Emergency Contact: Jane Smith
-    Emergency Phone: (555) 987-6543
-    
-    Medical Conditions: Diabetes, Hypertension
-    Medications: Metformin, Lisinopril
-    """
+    sample_client_text = SAMPLE_CLIENT_TEXT
     
     # Parse the sample text
     parsed_data = parser._extract_data_from_text(sample_client_text)
     
-    print("✓ PDF parser extracted client data:")
-    print(f"  - Name: {parsed_data['personal_info'].get('full_name', 'N/A')}")
-    print(f"  - Preferred Name: {parsed_data['personal_info'].get('preferred_name', 'N/A')}")
-    print(f"  - Salutation: {parsed_data['personal_info'].get('salutation', 'N/A')}")
-    print(f"  - Gender: {parsed_data['personal_info'].get('gender', 'N/A')}")
-    print(f"  - SSN: {parsed_data['personal_info'].get('ssn', 'N/A')}")
-    print(f"  - DOB: {parsed_data['personal_info'].get('date_of_birth', 'N/A')}")
-    print(f"  - Place of Birth: {parsed_data['personal_info'].get('place_of_birth', 'N/A')}")
-    print(f"  - Languages: {parsed_data['personal_info'].get('languages', 'N/A')}")
-    print(f"  - Religion: {parsed_data['personal_info'].get('religion', 'N/A')}")
-    print(f"  - Marital Status: {parsed_data['personal_info'].get('marital_status', 'N/A')}")
-    print(f"  - Nationality: {parsed_data['personal_info'].get('nationality', 'N/A')}")
-    print(f"  - Ethnicity: {parsed_data['personal_info'].get('ethnicity', 'N/A')}")
-    print(f"  - Primary Phone: {parsed_data['contact_info'].get('phone', 'N/A')}")
-    print(f"  - Secondary Phone: {parsed_data['contact_info'].get('secondary_phone', 'N/A')}")
-    print(f"  - Primary Email: {parsed_data['contact_info'].get('email', 'N/A')}")
-    print(f"  - Secondary Email: {parsed_data['contact_info'].get('secondary_email', 'N/A')}")
-    print(f"  - Address: {parsed_data['contact_info'].get('address', 'N/A')}")
-    print(f"  - Unit: {parsed_data['contact_info'].get('unit_apartment', 'N/A')}")
-    print(f"  - Postal Code: {parsed_data['contact_info'].get('postal_code', 'N/A')}")
-    print(f"  - Preferred Contact: {parsed_data['contact_info'].get('preferred_contact_method', 'N/A')}")
-    print(f"  - Emergency Contact: {parsed_data['emergency_contact'].get('name', 'N/A')}")
-    print(f"  - Emergency Phone: {parsed_data['emergency_contact'].get('phone', 'N/A')}")
-    print(f"  - Medical Conditions: {parsed_data['medical_info'].get('conditions', 'N/A')}")
-    print(f"  - Medications: {parsed_data['medical_info'].get('medications', 'N/A')}")
-    
     # Test packet type detection
     packet_type = parser.determine_packet_type(parsed_data)
-    print(f"  - Packet Type: {packet_type}")
+    
+    print(f"✓ PDF parser extracted client data:\n{_format_report(parsed_data, CLIENT_REPORT_FIELDS)}\n  - Packet Type: {packet_type}")
     
     return parsed_data
 
@@ -97,261 +87,141 @@ def test_pdf_parser_with_employee_data():
     parser = PDFParser()
     
     # Sample employee packet text
-    sample_employee_text = """
-    Employee Packet
-    
-    Name: Dr. Sarah Johnson
-    Date of Birth: 03/22/1985
-    Gender: Female
-    Phone: (555) 234-5678
-    Email: sarah.johnson@email.com
-    Address: 456 Oak Street, Denver, CO 80202
-    
-    Position: Registered Nurse
-    Department: Home Care
-    Employment Type: Full-time
-    
-    Emergency Contact: Michael Johnson
-    Emergency Phone: (555) 234-5679
-    
-    Medical Conditions: None
-    Medications: None
-    """
+    sample_employee_text = SAMPLE_EMPLOYEE_TEXT
     
     # Parse the sample text
     parsed_data = parser._extract_data_from_text(sample_employee_text)
     
-    print("✓ PDF parser extracted employee data:")
-    print(f"  - Name: {parsed_data['personal_info'].get('full_name', 'N/A')}")
-    print(f"  - Salutation: {parsed_data['personal_info'].get('salutation', 'N/A')}")
-    print(f"  - Gender: {parsed_data['personal_info'].get('gender', 'N/A')}")
-    print(f"  - DOB: {parsed_data['personal_info'].get('date_of_birth', 'N/A')}")
-    print(f"  - Phone: {parsed_data['contact_info'].get('phone', 'N/A')}")
-    print(f"  - Email: {parsed_data['contact_info'].get('email', 'N/A')}")
-    print(f"  - Position: {parsed_data['employment_info'].get('position', 'N/A')}")
-    print(f"  - Employment Type: {parsed_data['employment_info'].get('employment_type', 'N/A')}")
-    
     # Test packet type detection
     packet_type = parser.determine_packet_type(parsed_data)
-    print(f"  - Packet Type: {packet_type}")
+    
+    print(f"✓ PDF parser extracted employee data:\n{_format_report(parsed_data, EMPLOYEE_REPORT_FIELDS)}\n  - Packet Type: {packet_type}")
     
     return parsed_data
 
-async def test_shiftcare_client_form_filling():
-    """Test filling the actual Shiftcare client form with sample data"""
-    print("\nTesting Shiftcare client form filling...")
-    
-    # Sample client data
-    client_data = {
-        'personal_info': {
-            'full_name': 'Mr. John Smith',
-            'salutation': 'Mr',
-            'preferred_name': 'Johnny',
-            'gender': 'Male',
-            'ssn': '123-45-6789',
-            'date_of_birth': '05/15/1975',
-            'place_of_birth': 'Denver, Colorado',
-            'languages': 'English, Spanish',
-            'religion': 'Christian',
-            'marital_status': 'Married',
-            'nationality': 'American',
-            'ethnicity': 'Caucasian'
-        },
-        'contact_info': {
-            'phone': '(555) 123-4567',
-            'secondary_phone': '(555) 123-4568',
-            'email': 'john.smith@email.com',
-            'secondary_email': 'johnny.smith@gmail.com',
-            'address': '123 Main Street',
-            'unit_apartment': 'Apt 4B',
-            'postal_code': '80202',
-            'preferred_contact_method': 'Phone'
-        },
-        'emergency_contact': {
-            'name': 'Jane Smith',
-            'phone': '(555) 987-6543'
-        },
-        'medical_info': {
-            'conditions': 'Diabetes, Hypertension',
-            'medications': 'Metformin, Lisinopril'
-        }
-    }
-    
-    # Test the automation (without actually submitting)
+async def _with_session(fn):
+    """Log into Shiftcare once and run fn(automation) inside that browser session"""
     automation = ShiftcareAutomation(
-        username=os.getenv('SHIFTCARE_USERNAME'),
-        password=os.getenv('SHIFTCARE_PASSWORD')
+        username=ENV['SHIFTCARE_USERNAME'],
+        password=ENV['SHIFTCARE_PASSWORD'],
+        storage_state_path=SHIFTCARE_STORAGE_STATE_PATH
     )
     
     try:
         async with automation:
-            # Test login
-            login_success = await automation.login()
-            if login_success:
-                print("✓ Successfully logged into Shiftcare")
-                
-                # Navigate to new client page
-                await automation.page.goto(f"{automation.base_url}/clients/new")
-                await automation.page.wait_for_load_state('networkidle')
-                
-                print("✓ Successfully navigated to new client page")
-                
-                # Test form field detection
-                name_parts = client_data['personal_info']['full_name'].strip().split()
-                
-                # Check if form fields are present
-                first_name_field = automation.page.locator('input[placeholder*="First Name"]')
-                last_name_field = automation.page.locator('input[placeholder*="Last/Family Name"]')
-                email_field = automation.page.locator('input[placeholder*="Email"]')
-                ssn_field = automation.page.locator('input[placeholder*="Social Security Number"]')
-                
-                if await first_name_field.is_visible():
-                    print("✓ First name field detected")
-                if await last_name_field.is_visible():
-                    print("✓ Last name field detected")
-                if await email_field.is_visible():
-                    print("✓ Email field detected")
-                if await ssn_field.is_visible():
-                    print("✓ SSN field detected")
-                
-                # Test filling form fields (without submitting)
-                if len(name_parts) >= 1:
-                    await first_name_field.fill(name_parts[0])
-                    print(f"✓ Filled first name: {name_parts[0]}")
-                
-                if len(name_parts) >= 2:
-                    await last_name_field.fill(name_parts[-1])
-                    print(f"✓ Filled last name: {name_parts[-1]}")
-                
-                if client_data['contact_info'].get('email'):
-                    await email_field.fill(client_data['contact_info']['email'])
-                    print(f"✓ Filled email: {client_data['contact_info']['email']}")
-                
-                if client_data['personal_info'].get('ssn'):
-                    await ssn_field.fill(client_data['personal_info']['ssn'])
-                    print(f"✓ Filled SSN: {client_data['personal_info']['ssn']}")
-                
-                print("✓ Client form filling test completed successfully")
-                
-            else:
+            # Test login, skipped while the saved login state is still accepted
+            login_success = await automation.ensure_logged_in()
+            if not login_success:
                 print("✗ Failed to login to Shiftcare")
                 return False
-                
+            
+            print("✓ Successfully logged into Shiftcare")
+            return await fn(automation)
+            
+    except Exception as e:
+        print(f"✗ Error testing Shiftcare session: {e}")
+        return False
+
+async def _fill_fields(automation, fields):
+    """Fill the (label, selector, value) fields that have a value in one page.evaluate, then report them"""
+    # Concurrent locator fills on one page can type into each other's focus; the automation's batched
+    # fill avoids that and also says which inputs were missing, so it doubles as the detection probe
+    fields = [field for field in fields if field[2]]
+    missing = await automation._fill_form([(selector, value, 'fill') for _, selector, value in fields])
+    found = [field for field in fields if field[1] not in missing]
+    
+    lines = [f"✓ {label[:1].upper() + label[1:]} field detected" for label, _, _ in found]
+    lines.extend(f"✓ Filled {label}: {value}" for label, _, value in found)
+    if lines:
+        print("\n".join(lines))
+
+async def _fill_client_form(automation, client_data=SAMPLE_CLIENT_DATA):
+    """Fill the Shiftcare client form on a logged-in session (without submitting)"""
+    try:
+        # Navigate to new client page
+        # Wait for the name input instead of network idle; the batched fill below does not wait itself
+        await automation.page.goto(f"{automation.base_url}/clients/new", wait_until='domcontentloaded')
+        await automation._wait_ready(FIRST_NAME_INPUT)
+        
+        print("✓ Successfully navigated to new client page")
+        
+        # Detect and fill the form fields in one round trip (without submitting), skipping values the data does not have
+        await _fill_fields(automation, [
+            ("first name", FIRST_NAME_INPUT, client_data['personal_info']['first_name']),
+            ("last name", LAST_NAME_INPUT, client_data['personal_info']['last_name']),
+            ("email", EMAIL_INPUT, client_data['contact_info'].get('email')),
+            ("SSN", SSN_INPUT, client_data['personal_info'].get('ssn'))
+        ])
+        
+        print("✓ Client form filling test completed successfully")
+        
     except Exception as e:
         print(f"✗ Error testing Shiftcare client form: {e}")
         return False
     
     return True
 
-async def test_shiftcare_employee_form_filling():
-    """Test filling the actual Shiftcare employee form with sample data"""
-    print("\nTesting Shiftcare employee form filling...")
-    
-    # Sample employee data
-    employee_data = {
-        'personal_info': {
-            'full_name': 'Dr. Sarah Johnson',
-            'salutation': 'Dr',
-            'gender': 'Female',
-            'date_of_birth': '03/22/1985'
-        },
-        'contact_info': {
-            'phone': '(555) 234-5678',
-            'email': 'sarah.johnson@email.com',
-            'address': '456 Oak Street, Denver, CO 80202'
-        },
-        'employment_info': {
-            'position': 'Registered Nurse',
-            'department': 'Home Care',
-            'employment_type': 'Full-time'
-        }
-    }
-    
-    # Test the automation (without actually submitting)
-    automation = ShiftcareAutomation(
-        username=os.getenv('SHIFTCARE_USERNAME'),
-        password=os.getenv('SHIFTCARE_PASSWORD')
-    )
-    
+async def _fill_employee_form(automation, employee_data=SAMPLE_EMPLOYEE_DATA):
+    """Fill the Shiftcare employee form on a logged-in session (without submitting)"""
     try:
-        async with automation:
-            # Test login
-            login_success = await automation.login()
-            if login_success:
-                print("✓ Successfully logged into Shiftcare")
-                
-                # Navigate to new staff page
-                await automation.page.goto(f"{automation.base_url}/users/staff/new")
-                await automation.page.wait_for_load_state('networkidle')
-                
-                print("✓ Successfully navigated to new staff page")
-                
-                # Test form field detection
-                name_parts = employee_data['personal_info']['full_name'].strip().split()
-                
-                # Check if form fields are present
-                first_name_field = automation.page.locator('input[placeholder*="First Name"]')
-                last_name_field = automation.page.locator('input[placeholder*="Last/Family Name"]')
-                email_field = automation.page.locator('input[placeholder*="Email"]')
-                
-                if await first_name_field.is_visible():
-                    print("✓ First name field detected")
-                if await last_name_field.is_visible():
-                    print("✓ Last name field detected")
-                if await email_field.is_visible():
-                    print("✓ Email field detected")
-                
-                # Test filling form fields (without submitting)
-                if len(name_parts) >= 1:
-                    await first_name_field.fill(name_parts[0])
-                    print(f"✓ Filled first name: {name_parts[0]}")
-                
-                if len(name_parts) >= 2:
-                    await last_name_field.fill(name_parts[-1])
-                    print(f"✓ Filled last name: {name_parts[-1]}")
-                
-                if employee_data['contact_info'].get('email'):
-                    await email_field.fill(employee_data['contact_info']['email'])
-                    print(f"✓ Filled email: {employee_data['contact_info']['email']}")
-                
-                print("✓ Employee form filling test completed successfully")
-                
-            else:
-                print("✗ Failed to login to Shiftcare")
-                return False
-                
+        # Navigate to new staff page
+        # Wait for the name input instead of network idle; the batched fill below does not wait itself
+        await automation.page.goto(f"{automation.base_url}/users/staff/new", wait_until='domcontentloaded')
+        await automation._wait_ready(FIRST_NAME_INPUT)
+        
+        print("✓ Successfully navigated to new staff page")
+        
+        # Detect and fill the form fields in one round trip (without submitting), skipping values the data does not have
+        await _fill_fields(automation, [
+            ("first name", FIRST_NAME_INPUT, employee_data['personal_info']['first_name']),
+            ("last name", LAST_NAME_INPUT, employee_data['personal_info']['last_name']),
+            ("email", EMAIL_INPUT, employee_data['contact_info'].get('email'))
+        ])
+        
+        print("✓ Employee form filling test completed successfully")
+        
     except Exception as e:
         print(f"✗ Error testing Shiftcare employee form: {e}")
         return False
     
     return True
 
+async def _fill_on_session(automation, name, fill_form):
+    """Fill one form on its own pooled context, which starts from the saved login"""
+    print(f"\nTesting Shiftcare {name} form filling...")
+    async with automation.session() as session:
+        result = await fill_form(session)
+    
+    if result:
+        print(f"✓ Shiftcare {name} form filling test passed")
+    else:
+        print(f"✗ Shiftcare {name} form filling test failed")
+    return result
+
+async def _fill_all_forms(automation):
+    """Fill the client and employee forms concurrently, each on a separate browser context"""
+    results = await asyncio.gather(
+        _fill_on_session(automation, 'client', _fill_client_form),
+        _fill_on_session(automation, 'employee', _fill_employee_form)
+    )
+    return all(results)
+
+async def test_shiftcare_client_form_filling():
+    """Test filling the actual Shiftcare client form with sample data"""
+    print("\nTesting Shiftcare client form filling...")
+    return await _with_session(_fill_client_form)
+
+async def test_shiftcare_employee_form_filling():
+    """Test filling the actual Shiftcare employee form with sample data"""
+    print("\nTesting Shiftcare employee form filling...")
+    return await _with_session(_fill_employee_form)
+
 def main():
     """Run comprehensive tests"""
     print("Comprehensive GoFormz-Shiftcare Integration Test")
     print("=" * 60)
     
-    # Check environment variables
-    required_vars = [
-        'GOFORMZ_CLIENT_ID',
-        'GOFORMZ_CLIENT_SECRET',
-        'SHIFTCARE_USERNAME',
-        'SHIFTCARE_PASSWORD'
-    ]
-    
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        print("✗ Missing environment variables:")
-        for var in missing_vars:
-            print(f"  - {var}")
-        print("\nPlease create a .env file with the required variables.")
-        return False
-    
-    print("✓ All environment variables found")
-    print()
-    
-    # Test PDF parsing for both client and employee
+    # Test PDF parsing for both client and employee; it needs no credentials, so it always runs
     try:
         client_data = test_pdf_parser_with_client_data()
         print("✓ Client PDF parsing test passed")
@@ -366,27 +236,18 @@ def main():
         print(f"✗ Employee PDF parsing test failed: {e}")
         return False
     
-    # Test Shiftcare form filling for both client and employee
-    try:
-        client_result = asyncio.run(test_shiftcare_client_form_filling())
-        if client_result:
-            print("✓ Shiftcare client form filling test passed")
-        else:
-            print("✗ Shiftcare client form filling test failed")
-            return False
-    except Exception as e:
-        print(f"✗ Shiftcare client form filling test failed: {e}")
-        return False
+    # Only the browser tests need Shiftcare credentials
+    print()
+    if skip_shiftcare_tests():
+        return True
+    print()
     
+    # Test Shiftcare form filling for client and employee concurrently, sharing one login
     try:
-        employee_result = asyncio.run(test_shiftcare_employee_form_filling())
-        if employee_result:
-            print("✓ Shiftcare employee form filling test passed")
-        else:
-            print("✗ Shiftcare employee form filling test failed")
+        if not asyncio.run(_with_session(_fill_all_forms)):
             return False
     except Exception as e:
-        print(f"✗ Shiftcare employee form filling test failed: {e}")
+        print(f"✗ Shiftcare form filling test failed: {e}")
         return False
     
     print()
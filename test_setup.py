@@ -3,22 +3,18 @@
 Test script for GoFormz-Shiftcare integration
 """
 
-import os
 import asyncio
-from dotenv import load_dotenv
 from goformz_client import GoFormzClient
 from pdf_parser import PDFParser
-
-# Load environment variables
-load_dotenv()
+from fixtures import ENV, require_env_vars
 
 def test_goformz_connection():
     """Test GoFormz API connection"""
     print("Testing GoFormz API connection...")
     
     client = GoFormzClient(
-        client_id=os.getenv('GOFORMZ_CLIENT_ID'),
-        client_secret=os.getenv('GOFORMZ_CLIENT_SECRET')
+        client_id=ENV['GOFORMZ_CLIENT_ID'],
+        client_secret=ENV['GOFORMZ_CLIENT_SECRET']
     )
     
     try:
@@ -97,23 +93,8 @@ def main():
     print("=" * 40)
     
     # Check environment variables
-    required_vars = [
-        'GOFORMZ_CLIENT_ID',
-        'GOFORMZ_CLIENT_SECRET',
-        'SHIFTCARE_USERNAME',
-        'SHIFTCARE_PASSWORD'
-    ]
-    
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        print("✗ Missing environment variables:")
-        for var in missing_vars:
-            print(f"  - {var}")
-        print("\nPlease create a .env file with the required variables.")
+    if not require_env_vars():
         return False
-    
-    print("✓ All environment variables found")
     print()
     
     # Run tests